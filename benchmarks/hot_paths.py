@@ -0,0 +1,318 @@
+"""Measure the latency of the estimator hot paths, fully offline.
+
+Model configs come from benchmarks/fixtures. The lookup data, the regression model and
+the datasets are generated in a temporary directory, so nothing is downloaded from the
+hub. Run from the root of the repo:
+
+    python benchmarks/hot_paths.py --output_path benchmarks/baselines/<release>.json \
+        --baseline benchmarks/baselines/reference.json
+"""
+
+# Standard
+from pathlib import Path
+import copy
+import importlib.metadata
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# the fixtures cover everything, make sure nothing goes out to the hub
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("HF_DATASETS_OFFLINE", "1")
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+# Third Party
+import fire
+import numpy
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, ROOT.as_posix())
+
+# First Party
+from fm_training_estimator.config.arguments import (
+    DataArguments,
+    EstimateInput,
+    EstimatorMetadata,
+    FMArguments,
+    HFTrainingArguments,
+    InfraArguments,
+    JobConfig,
+)
+from fm_training_estimator.utils import configure_result_cache, extract_model_features
+
+FIXTURES = Path(__file__).parent / "fixtures"
+MODELS = {
+    "granite-7b-base": (FIXTURES / "models" / "granite-7b-base").as_posix(),
+    "llama-3-8b": (FIXTURES / "models" / "llama-3-8b").as_posix(),
+}
+# model used by all the estimate benchmarks
+MODEL = MODELS["granite-7b-base"]
+
+TECHNIQUES = ["full", "lora", "qlora"]
+GPU_MODELS = ["A100", "H100"]
+NUM_GPUS = [1, 2, 4, 8]
+BATCH_SIZES = [1, 2, 4, 8, 16]
+SEQ_LENS = [512, 1024, 2048, 4096]
+
+SEED = 42
+TEXT_FIELD = "### Instruction:\n{instruction}\n### Response:\n{output}"
+
+
+def make_lookup_data(path: str):
+    """write synthetic lookup data in the v3 format, covering all fixture models"""
+    rng = numpy.random.default_rng(SEED)
+
+    lines = [
+        "model_arch,model_hidden_size,model_intermediate_size,model_num_attn_heads,"
+        "model_num_hidden_layers,model_num_key_value_heads,method,gpu_model,"
+        "number_gpus,batch_size,seq_len,tokens_per_second,memory,memory_act"
+    ]
+    for model in MODELS.values():
+        feats = extract_model_features(model, fmt="csv")
+        for method in TECHNIQUES:
+            for gpu_model in GPU_MODELS:
+                for g in NUM_GPUS:
+                    for b in BATCH_SIZES:
+                        for s in SEQ_LENS:
+                            act = 2 * b * s * 4096 * 32 * rng.uniform(0.9, 1.1)
+                            mem = 14e9 / g + act
+                            tps = g * b * s / (1 + b * s / 8192) * rng.uniform(0.9, 1.1)
+                            lines.append(
+                                f"{feats},{method},{gpu_model},{g},{b},{s},{tps:.2f},{mem:.0f},{act:.0f}"
+                            )
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def make_dataset(path: str, rows: int):
+    """write a synthetic instruction tuning dataset, with log-normal field lengths"""
+    rng = numpy.random.default_rng(SEED)
+    filler = "lorem ipsum dolor sit amet " * 200
+
+    instruction = numpy.minimum(rng.lognormal(3.5, 0.6, rows), len(filler)).astype(int)
+    output = numpy.minimum(rng.lognormal(4.5, 0.8, rows), len(filler)).astype(int)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for i, o in zip(instruction, output):
+            f.write(
+                json.dumps({"instruction": filler[:i], "output": filler[:o]}) + "\n"
+            )
+
+
+def make_regression_model(data_path: str, model_path: str):
+    # First Party
+    from fm_training_estimator.regressor import XGBoostRegressor
+
+    XGBoostRegressor().train(
+        data_path, model_path, ["tokens_per_second", "memory", "memory_act"]
+    )
+
+
+def _estimate_input(technique: str, dataset: str, lookup_data_path: str):
+    job_config = JobConfig(
+        HFTrainingArguments(
+            per_device_train_batch_size=4, output_dir="./output", logging_dir="./logs"
+        ),
+        FMArguments(base_model_path=MODEL, block_size=1024, technique=technique),
+        DataArguments(te_approach=0, dataset=dataset, dataset_text_field=TEXT_FIELD),
+        InfraArguments(numGpusPerPod=2),
+    )
+    return EstimateInput(
+        job_configs=[job_config],
+        estimator_metadata=EstimatorMetadata(base_data_path=lookup_data_path),
+    )
+
+
+def _ui_config(technique: str, dataset: str):
+    return {
+        "base_model_path": MODEL,
+        "technique": technique,
+        "block_size": 1024,
+        "per_device_train_batch_size": 4,
+        "numGpusPerPod": 2,
+        "output_dir": "./output",
+        "logging_dir": "./logs",
+        "te_approach": 0,
+        "dataset": dataset,
+        "dataset_text_field": TEXT_FIELD,
+    }
+
+
+def build_cases(workdir: str, rows: list):
+    """generate the inputs in workdir and return the benchmarks, by name"""
+    # First Party
+    from fm_training_estimator.regressor import LookupRegressor, XGBoostRegressor
+    from fm_training_estimator.sdk import (
+        estimate_memory,
+        estimate_time,
+        estimate_tokens,
+    )
+    from fm_training_estimator.tokens.te0 import TokenEstimator0
+    from fm_training_estimator.tokens.te2.te2 import GenerateTokenEstimator2Contract
+    from fm_training_estimator.ui.core import run
+
+    lookup_data_path = os.path.join(workdir, "lookup.csv")
+    make_lookup_data(lookup_data_path)
+    model_path = os.path.join(workdir, "model.zip")
+    make_regression_model(lookup_data_path, model_path)
+
+    datasets = {}
+    for n in rows:
+        datasets[n] = os.path.join(workdir, f"data_{n}.jsonl")
+        make_dataset(datasets[n], n)
+    # the estimate benchmarks use the smallest dataset
+    dataset = datasets[min(rows)]
+
+    cases = {}
+
+    for technique in TECHNIQUES:
+        est_input = _estimate_input(technique, dataset, lookup_data_path)
+        for fn in (estimate_memory, estimate_time, estimate_tokens):
+            # estimates update the job config, so every run gets a fresh copy
+            cases[f"sdk.{fn.__name__}[{technique}]"] = (
+                lambda fn=fn, est_input=est_input: fn(
+                    copy.deepcopy(est_input), model_path
+                )
+            )
+
+        config = _ui_config(technique, dataset)
+        cases[f"ui.core.run[{technique}]"] = lambda config=config: run(
+            config, lookup_data_path, model_path
+        )
+
+    for n, path in datasets.items():
+        da = DataArguments(te_approach=0, dataset=path, dataset_text_field=TEXT_FIELD)
+        cases[f"TokenEstimator0[{n}]"] = lambda da=da: TokenEstimator0(da)
+        cases[f"GenerateTokenEstimator2Contract[{n}]"] = (
+            lambda path=path: GenerateTokenEstimator2Contract(path)
+        )
+
+    lookup_est = LookupRegressor(lookup_data_path)
+    query = {
+        **extract_model_features(MODEL),
+        "method": "full",
+        "gpu_model": "A100",
+        "number_gpus": 2,
+        "batch_size": 4,
+        "seq_len": 1024,
+    }
+    cases["LookupRegressor.run"] = lambda: lookup_est.run(query)
+    cases["LookupRegressor.lookup"] = lambda: lookup_est.lookup(query)
+
+    reg_est = XGBoostRegressor(model_path)
+    params = list(query.values())
+    cases["XGBoostRegressor.run"] = lambda: reg_est.run(params, "tokens_per_second")
+
+    return cases
+
+
+def time_case(fn, repeat: int) -> dict:
+    """run fn once to warm up, then time it repeat times"""
+    fn()
+
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """print the results against the baseline, returning the names of the regressions"""
+    regressions = []
+    for name, res in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:50s} {res['median'] * 1000:10.2f}ms  (not in baseline)")
+            continue
+
+        ratio = res["median"] / base["median"]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:50s} {res['median'] * 1000:10.2f}ms  baseline {base['median'] * 1000:10.2f}ms"
+            f"  x{ratio:.2f}{flag}"
+        )
+
+    return regressions
+
+
+def _version():
+    try:
+        return importlib.metadata.version("fm_training_estimator")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def main(
+    repeat: int = 5,
+    rows: tuple = (10_000, 1_000_000),
+    only: str = "",
+    output_path: str = "",
+    baseline: str = "",
+    threshold: float = 1.5,
+):
+    """Run the benchmarks and optionally store and compare the results.
+
+    Args:
+        repeat (int): number of timed runs of every benchmark, after one warm up run.
+        rows (tuple): sizes of the synthetic datasets for the token estimator benchmarks.
+        only (str): only run the benchmarks whose name contains this string.
+        output_path (str): path of the json file to store the results in.
+        baseline (str): path of a json file with earlier results to compare against.
+        threshold (float): slowdown of the median time against the baseline, above which
+            a benchmark counts as a regression. Any regression makes the exit code 1.
+    """
+    if isinstance(rows, int):
+        rows = (rows,)
+
+    # repeated estimates must be computed, not served from the result cache
+    configure_result_cache(maxsize=0)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # keep the arrow files of the generated datasets out of the user's cache
+        os.environ["HF_DATASETS_CACHE"] = os.path.join(workdir, "datasets")
+        cases = build_cases(workdir, list(rows))
+
+        results = {}
+        for name, fn in cases.items():
+            if only not in name:
+                continue
+            results[name] = time_case(fn, repeat)
+            print(f"{name:50s} {results[name]['median'] * 1000:10.2f}ms")
+
+    out = {
+        "version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+    if output_path != "":
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=4)
+
+    if baseline != "":
+        with open(baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), threshold)
+        if len(regressions) > 0:
+            print(f"{len(regressions)} regression(s) against {baseline}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,80 @@
+"""Measure the cold start time of the estimator entry points.
+
+Every import is timed in a fresh interpreter, since modules are cached after the first
+import. Run from the root of the repo:
+
+    python benchmarks/import_time.py --repeat 5
+"""
+
+# Standard
+from pathlib import Path
+import json
+import statistics
+import subprocess
+import sys
+
+# Third Party
+import fire
+
+ROOT = Path(__file__).parent.parent
+
+ENTRY_POINTS = [
+    "fm_training_estimator.config",
+    "fm_training_estimator.sdk",
+    "fm_training_estimator.ui.core",
+    "fm_training_estimator.ui.cli",
+]
+
+# libraries that should only be loaded by the code paths that need them
+HEAVY_MODULES = [
+    "peft",
+    "datasets",
+    "xgboost",
+    "sklearn",
+    "orchestrator",
+    "gradio",
+]
+
+_SCRIPT = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+t = time.perf_counter() - t
+print(json.dumps({{"time": t, "loaded": [m for m in {heavy} if m in sys.modules]}}))
+"""
+
+
+def time_import(module: str) -> dict:
+    """import the module in a fresh interpreter and return the time taken and heavy modules loaded"""
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(repeat: int = 3, output_path: str = ""):
+    results = {}
+    for module in ENTRY_POINTS:
+        runs = [time_import(module) for _ in range(repeat)]
+        times = [r["time"] for r in runs]
+        results[module] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "loaded": runs[0]["loaded"],
+        }
+        print(
+            f"{module:40s} min {min(times):6.2f}s  median {statistics.median(times):6.2f}s"
+            f"  heavy modules loaded: {', '.join(runs[0]['loaded']) or '-'}"
+        )
+
+    if output_path != "":
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
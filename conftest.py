@@ -0,0 +1,24 @@
+# Third Party
+import pytest
+
+# First Party
+from fm_training_estimator.utils import get_result_cache
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _model_config_cache(tmp_path_factory):
+    # tests never read nor write the model configs stored in the home directory
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv(
+            "ESTIMATOR_MODEL_CONFIG_CACHE",
+            tmp_path_factory.mktemp("model_configs").as_posix(),
+        )
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _result_cache():
+    # estimates cached by one test must not be returned to the next
+    get_result_cache().clear()
+    yield
+    get_result_cache().clear()
@@ -5,12 +5,22 @@ from .arguments import (
     HFTrainingArguments,
     InfraArguments,
     PeftLoraConfig,
-    PeftPromptTuningConfig,
     PeftQLoraConfig,
 )
 from .parser import parse
 from .utils import is_fsdp
 
+
+def __getattr__(name):
+    # defined on first use, see arguments.py
+    if name == "PeftPromptTuningConfig":
+        # Local
+        from . import arguments
+
+        return arguments.PeftPromptTuningConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "FMArguments",
     "PeftPromptTuningConfig",
@@ -1,22 +1,37 @@
 # Standard
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # Third Party
 from dataclass_wizard import JSONWizard
-from peft.tuners.lora import LoraConfig
-from peft.tuners.prompt_tuning import PromptTuningConfig
 from transformers import TrainingArguments
 
 
-@dataclass
-class PeftPromptTuningConfig(PromptTuningConfig):
-    """dataclass for prompt tuning config
+def _define_prompt_tuning_config():
+    # Third Party
+    from peft.tuners.prompt_tuning import PromptTuningConfig
 
-    Args:
-        PromptTuningConfig (_type_): imported directly from peft library
-    """
+    @dataclass
+    class PeftPromptTuningConfig(PromptTuningConfig):
+        """dataclass for prompt tuning config
+
+        Args:
+            PromptTuningConfig (_type_): imported directly from peft library
+        """
+
+    PeftPromptTuningConfig.__module__ = __name__
+    PeftPromptTuningConfig.__qualname__ = "PeftPromptTuningConfig"
+    return PeftPromptTuningConfig
+
+
+def __getattr__(name):
+    # importing peft takes seconds and it is only needed for prompt tuning,
+    # so PeftPromptTuningConfig is defined on first use
+    if name == "PeftPromptTuningConfig":
+        globals()[name] = _define_prompt_tuning_config()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
@@ -231,6 +246,8 @@ class TimeEstimate:
 
     time: str
     train_time: str
+    # wall time and number of calls per stage, only set when profiling
+    timings: Optional[Dict[str, Dict[str, float]]] = None
 
 
 @dataclass
@@ -243,6 +260,8 @@ class MemoryEstimate:
     model_memory: str
     optimizer_memory: str
     num_gpus: int
+    # wall time and number of calls per stage, only set when profiling
+    timings: Optional[Dict[str, Dict[str, float]]] = None
 
 
 @dataclass
@@ -250,6 +269,8 @@ class TokensEstimate:
     """The estimated token response to estimate_token function."""
 
     tps: float
+    # wall time and number of calls per stage, only set when profiling
+    timings: Optional[Dict[str, Dict[str, float]]] = None
 
 
 @dataclass
@@ -267,3 +288,16 @@ class Estimate:
     time: TimeEstimate
     tokens: TokensEstimate
     cost: CostEstimate
+    # wall time and number of calls per stage, only set when profiling
+    timings: Optional[Dict[str, Dict[str, float]]] = None
+
+
+@dataclass
+class BatchEstimateResult:
+    """The result for a single job config in the response to estimate_batch function.
+
+    Exactly one of estimate and error is set.
+    """
+
+    estimate: Optional[Estimate] = None
+    error: Optional[str] = None
@@ -0,0 +1,51 @@
+# Standard
+import os
+
+# Third Party
+import fire
+
+# Local
+from .manager import (
+    ARROW_EXTENSIONS,
+    PARQUET_EXTENSIONS,
+    get_format_by_version,
+    lookup_format_version,
+)
+
+
+def convert(data_path: str, output_path: str):
+    """
+    Inputs:
+    data_path: <str> the path to a lookup data csv file, in one of the formats of the data module
+    output_path: <str> the path to write the data to, an Arrow IPC file (.arrow, .feather or .ipc), which the lookup module memory maps, or a Parquet file (.parquet)
+    """
+    # Third Party
+    import pandas
+    import pyarrow
+    import pyarrow.feather
+    import pyarrow.parquet
+
+    data = pandas.read_csv(data_path)
+    version = lookup_format_version(",".join(data.columns))
+    if get_format_by_version(version) is None:
+        raise ValueError(
+            f"columns of {data_path} do not match any data format: {list(data.columns)}"
+        )
+
+    print(f"Converting {len(data)} rows of format {version}...")
+    table = pyarrow.Table.from_pandas(data, preserve_index=False)
+
+    ext = os.path.splitext(output_path)[1]
+    if ext in ARROW_EXTENSIONS:
+        # uncompressed, so that the file can be memory mapped as it is
+        pyarrow.feather.write_feather(table, output_path, compression="uncompressed")
+    elif ext in PARQUET_EXTENSIONS:
+        pyarrow.parquet.write_table(table, output_path)
+    else:
+        raise ValueError(f"unknown extension of {output_path}")
+
+    print("...successfully wrote data to file: ", output_path)
+
+
+if __name__ == "__main__":
+    fire.Fire(convert)
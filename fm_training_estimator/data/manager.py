@@ -1,6 +1,10 @@
 # Local
 from ..utils import extract_model_features
 
+# extensions of the columnar files lookup data can be stored in, besides csv
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+PARQUET_EXTENSIONS = (".parquet",)
+
 
 class Format:
     """A class to track the various data formats used for lookup/regressor.
@@ -16,6 +20,9 @@ class Format:
     def get_all_columns_string(self):
         return self.X + "," + self.Y
 
+    def get_all_columns(self):
+        return self.get_all_columns_string().split(",")
+
     def get_empty_key_dict(self):
         res = {}
         for x in self.X.split(","):
@@ -1,6 +1,23 @@
-# Local
-from .fsdp import FSDPEstimator
-from .full import FullParameterTuningEstimator
-from .hybrid import HybridEstimator
-from .lora import HybridLoraEstimator, LoraEstimator
-from .qlora import HybridQLoraEstimator, QLoraEstimator
+# Standard
+import importlib
+
+# the estimators are imported on first use, so that importing one does not pull
+# in the dependencies of all the others
+_lazy_attrs = {
+    "FSDPEstimator": ".fsdp",
+    "FullParameterTuningEstimator": ".full",
+    "HybridEstimator": ".hybrid",
+    "HybridLoraEstimator": ".lora",
+    "LoraEstimator": ".lora",
+    "HybridQLoraEstimator": ".qlora",
+    "QLoraEstimator": ".qlora",
+    "VectorizedMemoryEstimator": ".vectorized",
+}
+
+__all__ = list(_lazy_attrs)
+
+
+def __getattr__(name):
+    if name in _lazy_attrs:
+        return getattr(importlib.import_module(_lazy_attrs[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
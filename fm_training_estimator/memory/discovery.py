@@ -0,0 +1,101 @@
+# Standard
+from typing import Callable, Optional
+import math
+
+# Local
+from ..utils import logger
+
+# Upper bound of the number of gpus considered when discovering it, covering multi pod jobs
+MAX_NUM_GPUS = 1024
+
+
+def find_min_num_gpus(
+    fits: Callable[[int], bool], guess: int = 1, max_num_gpus: int = MAX_NUM_GPUS
+) -> Optional[int]:
+    """return the smallest number of gpus for which the config fits in gpu memory
+
+    Memory per gpu is assumed not to grow with the number of gpus, so once a number
+    of gpus fits, all larger ones do. Starting at the guess, the search doubles its
+    step until it crosses the boundary, up or down, and then bisects, so fits is
+    called a number of times logarithmic in the distance from the guess to the result.
+
+    Where the assumption does not hold, eg, for memory predicted by a regression model,
+    fits is not monotonic and the search may land on a boundary other than the first.
+    The result still fits, and one gpu less does not, but a smaller number of gpus
+    away from that boundary may fit too.
+
+    Args:
+        fits (Callable[[int], bool]): whether the config fits on the given number of gpus.
+        guess (int, optional): where to start the search, eg, a theory estimate.
+        max_num_gpus (int, optional): the largest number of gpus to consider.
+
+    Returns:
+        Optional[int]: the smallest number of gpus that fits, or None if even
+            max_num_gpus does not.
+    """
+    guess = min(max(guess, 1), max_num_gpus)
+    calls = 0
+
+    def check(n):
+        nonlocal calls
+        calls += 1
+        return fits(n)
+
+    # find lo < hi such that lo does not fit and hi does, with 0 never fitting
+    step = 1
+    if check(guess):
+        lo, hi = guess - step, guess
+        while lo > 0 and check(lo):
+            hi = lo
+            step *= 2
+            lo = max(hi - step, 0)
+    else:
+        lo, hi = guess, guess + step
+        while True:
+            if hi >= max_num_gpus:
+                hi = max_num_gpus
+                if hi == lo or not check(hi):
+                    logger.debug(
+                        "Memory - no num gpus up to %d fits, after %d checks",
+                        max_num_gpus,
+                        calls,
+                    )
+                    return None
+                break
+            if check(hi):
+                break
+            lo = hi
+            step *= 2
+            hi = lo + step
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if check(mid):
+            hi = mid
+        else:
+            lo = mid
+
+    logger.debug("Memory - discovered num gpus %d, after %d checks", hi, calls)
+    return hi
+
+
+def solve_min_num_gpus(
+    fixed: float, sharded: float, gpu_memory: float, max_num_gpus: int = MAX_NUM_GPUS
+) -> Optional[int]:
+    """return the smallest number of gpus g with fixed + sharded / g < gpu_memory
+
+    This is the closed form of the discovery, for theory estimates where part of the
+    memory is the same on every gpu and the rest is split across them.
+
+    Returns:
+        Optional[int]: the smallest number of gpus that fits, or None if none up to
+            max_num_gpus does.
+    """
+    if fixed >= gpu_memory:
+        return None
+
+    num_gpus = max(math.floor(sharded / (gpu_memory - fixed)) + 1, 1)
+    if num_gpus > max_num_gpus:
+        return None
+
+    return num_gpus
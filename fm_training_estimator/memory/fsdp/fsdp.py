@@ -5,6 +5,10 @@ import math
 from ...config import FMArguments, HFTrainingArguments
 from ...utils import fmt_size
 from ..full import FullParameterTuningEstimator
+from ..memo import memoized
+
+# what the memory components depend on, besides the config
+_INPUTS = ("num_gpus", "base.b", "base.s", "base.num_of_trainable_params")
 
 
 class FSDPEstimator:
@@ -77,6 +81,7 @@ class FSDPEstimator:
             return fmt_size(size)
         return size
 
+    @memoized(*_INPUTS)
     def calculate_activation_memory(self, readable: bool = False):
         # activations are not sharded however, they are reduced by the minibatch size
         # minibatch is the per device batch size
@@ -85,6 +90,7 @@ class FSDPEstimator:
             return fmt_size(size)
         return size
 
+    @memoized(*_INPUTS)
     def calculate_gradient_memory(self, readable: bool = False):
         size = self.base.calculate_gradient_memory(readable=False) / (
             self.get_number_of_gpus()
@@ -93,6 +99,7 @@ class FSDPEstimator:
             return fmt_size(size)
         return size
 
+    @memoized(*_INPUTS)
     def calculate_optimizer_memory(self, readable: bool = False):
         size = self.base.calculate_optimizer_memory(readable=False) / (
             self.get_number_of_gpus()
@@ -101,6 +108,7 @@ class FSDPEstimator:
             return fmt_size(size)
         return size
 
+    @memoized(*_INPUTS)
     def calculate_model_memory(self, readable: bool = False):
         # at some point FSDP loads double the sharded model memory
         size = self.base.calculate_model_memory(readable=False)
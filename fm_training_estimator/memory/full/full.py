@@ -1,10 +1,16 @@
 # Third Party
-from transformers import AutoConfig, AutoTokenizer
 from transformers.training_args import OptimizerNames
 
 # Local
 from ...config import FMArguments, HFTrainingArguments
-from ...utils import fmt_size, get_size_from_precision, logger
+from ...utils import (
+    fmt_size,
+    get_model_config,
+    get_model_manifest,
+    get_size_from_precision,
+    logger,
+    span,
+)
 
 
 class FullParameterTuningEstimator:
@@ -13,7 +19,7 @@ class FullParameterTuningEstimator:
         self.train_args = train_args
         self.fm_args = fm_args
         self.model_path = self.fm_args.base_model_path
-        self.config = AutoConfig.from_pretrained(self.model_path)
+        self.config = get_model_config(self.model_path)
         # check https://github.com/bigscience-workshop/bigscience/tree/6917a3b5fefcf439d3485ca184b4d9f6ab605150/math#model-sizing
         if hasattr(self.config, "n_embed"):
             self.h = self.config.n_embed
@@ -35,12 +41,12 @@ class FullParameterTuningEstimator:
             a = self.config.num_attention_heads
         self.a = a
         self.b = self.train_args.per_device_train_batch_size
-        tokenizer = AutoTokenizer.from_pretrained(self.model_path)
-        n_positions = tokenizer.model_max_length
-        if hasattr(self.config, "n_positions"):
-            n_positions = self.config.n_positions
         if hasattr(self.config, "max_position_embeddings"):
             n_positions = self.config.max_position_embeddings
+        elif hasattr(self.config, "n_positions"):
+            n_positions = self.config.n_positions
+        else:
+            n_positions = self._get_tokenizer_max_length()
         self.model_max_length = n_positions
         self.s = min(self.fm_args.block_size, self.model_max_length)
         # trainable parameters in full paramter tuning
@@ -51,6 +57,20 @@ class FullParameterTuningEstimator:
         self.optimizer = OptimizerNames(self.train_args.optim)
         self.precision = self._get_precision()
 
+    def _get_tokenizer_max_length(self) -> int:
+        # only used when the config has no max length, the manifest of the model
+        # has the max length of its tokenizer
+        manifest = get_model_manifest(self.model_path)
+        if manifest is not None:
+            return manifest["model_max_length"]
+
+        # Third Party
+        from transformers import AutoTokenizer
+
+        with span("tokenizer"):
+            tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+        return tokenizer.model_max_length
+
     def set_trainable_parameters(self, num_params):
         self.num_of_trainable_params = num_params
 
@@ -158,16 +178,21 @@ class FullParameterTuningEstimator:
         ## check https://blog.eleuther.ai/transformer-math/#optimizer-states
         ## check https://huggingface.co/docs/transformers/v4.25.1/en/perf_train_gpu_one
         ## TODO: should detect 8-bit adamw if being used and compute
-        if self.optimizer == OptimizerNames.ADAMW_TORCH or OptimizerNames.ADAMW_HF:
+        # newer transformers releases dropped adamw_hf and default to adamw_torch_fused,
+        # so match on the adamw family instead of individual enum members
+        if self.optimizer == OptimizerNames.SGD:
+            multiplier = 4
+        else:
+            if not self.optimizer.value.startswith("adamw"):
+                logger.warning(
+                    f"Memory Full - No optimizer memory formula for {self.optimizer.value},"
+                    " using that of adamw."
+                )
             # optimizer state is funciton of gradients/parameters dtype
             if self.precision == "float32":
                 multiplier = 8
             elif self.precision == "float16" or self.precision == "bfloat16":
                 multiplier = 4
-        elif self.optimizer == OptimizerNames.SGD:
-            multiplier = 4
-        else:
-            raise NotImplementedError("computation for optimizer is not implemented")
         size = self.num_of_trainable_params * multiplier
         if readable:
             return fmt_size(size)
@@ -51,3 +51,14 @@ def test_gradient_checkpointing():
     mm2 = est2.calculate_activation_memory()
 
     assert mm2 * 10 < mm1
+
+
+def test_other_optimizer():
+    fm, ta, _, _, _, _ = parse({"optim": "adamw_torch"})
+    adamw = FullParameterTuningEstimator(fm, ta).calculate_optimizer_memory()
+
+    # optimizers without a formula of their own are estimated as adamw
+    for optim in ["adafactor", "lion_32bit"]:
+        fm, ta, _, _, _, _ = parse({"optim": optim})
+        est = FullParameterTuningEstimator(fm, ta)
+        assert est.calculate_optimizer_memory() == adamw
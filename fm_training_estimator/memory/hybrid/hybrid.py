@@ -1,10 +1,15 @@
 # Local
 from ...config import FMArguments, HFTrainingArguments, InfraArguments, is_fsdp
 from ...data import format_query
-from ...regressor import LookupRegressor, GetRegressor
+from ...regressor import get_shared_lookup_regressor, get_shared_regressor
 from ...utils import logger
+from ..discovery import find_min_num_gpus, solve_min_num_gpus
 from ..fsdp import FSDPEstimator
 from ..full import FullParameterTuningEstimator
+from ..memo import memoized
+
+# what lookups and regressions depend on, besides the config
+_INPUTS = ("fsdp_est.num_gpus", "ta.per_device_train_batch_size", "fm.block_size")
 
 
 class HybridEstimator:
@@ -15,6 +20,8 @@ class HybridEstimator:
         infra_args: InfraArguments,
         lookup_data_path,
         model_path,
+        lookup_est=None,
+        reg_est=None,
     ):
 
         logger.info("Memory Hybrid: Initializing")
@@ -46,14 +53,18 @@ class HybridEstimator:
         self.fsdp_est.set_number_of_gpus(self.ia.numGpusPerPod)
 
         # Lookup based estimator
-        if lookup_data_path is not None:
-            self.lookup_est = LookupRegressor(lookup_data_path)
+        if lookup_est is not None:
+            self.lookup_est = lookup_est
+        elif lookup_data_path is not None:
+            self.lookup_est = get_shared_lookup_regressor(lookup_data_path)
         else:
             self.lookup_est = None
 
         # Model based estimator
-        if model_path is not None:
-            self.reg_est = GetRegressor(model_path)
+        if reg_est is not None:
+            self.reg_est = reg_est
+        elif model_path is not None:
+            self.reg_est = get_shared_regressor(model_path)
         else:
             self.reg_est = None
 
@@ -62,29 +73,44 @@ class HybridEstimator:
             self.auto_discover_num_gpus()
 
     def auto_discover_num_gpus(self):
-        """Discover the number of gpus needed - by guess and emperical validation."""
+        """Discover the smallest number of gpus the config fits on."""
         logger.info("Memory Hybrid - Attempting auto discovery of num gpus...")
+        gpu_memory = self.ia.gpu_memory_in_gb * 1024**3
+
+        def fits(num_gpus):
+            self.fsdp_est.set_number_of_gpus(num_gpus)
+            return self.get_total_mem_estimate() < gpu_memory
+
+        if self.lookup_est is None and self.reg_est is None:
+            # theory only: activations, and the model with shard_grad_op, are on every
+            # gpu while the rest is split across them, so solve for the number of gpus
+            self.fsdp_est.set_number_of_gpus(1)
+            fixed = self.fsdp_est.calculate_activation_memory()
+            sharded = (
+                self.fsdp_est.calculate_gradient_memory()
+                + self.fsdp_est.calculate_optimizer_memory()
+            )
+            if "shard_grad_op" in self.fsdp_est.fsdp_options:
+                fixed += self.fsdp_est.calculate_model_memory()
+            else:
+                sharded += self.fsdp_est.calculate_model_memory()
+
+            num_gpus = solve_min_num_gpus(fixed, sharded, gpu_memory)
+            # guard against rounding right at the boundary
+            if num_gpus is not None and not fits(num_gpus):
+                num_gpus = find_min_num_gpus(fits, num_gpus)
+        else:
+            num_gpus = find_min_num_gpus(fits, self.fsdp_est.estimate_number_of_gpus())
 
-        guess = self.fsdp_est.estimate_number_of_gpus()
-        trials = 10
-
-        while trials > 0:
-            self.fsdp_est.set_number_of_gpus(guess)
-            mem = self.get_total_mem_estimate()
-
-            # acceptable memory configuration found
-            if mem < self.ia.gpu_memory_in_gb * 1024**3:
-                logger.debug(
-                    "Memory Hybrid - finalized num of gpus to: {}".format(guess)
-                )
-                return
-
-            guess += 1
-            trials -= 1
+        if num_gpus is None:
+            logger.warning("Memory Hybrid - No suitable num gpus found!")
+            self.fsdp_est.set_number_of_gpus(-1)
+            return
 
-        logger.warning("Memory Hybrid - No suitable num gpus found!")
-        self.fsdp_est.set_number_of_gpus(-1)
+        self.fsdp_est.set_number_of_gpus(num_gpus)
+        logger.debug("Memory Hybrid - finalized num of gpus to: {}".format(num_gpus))
 
+    @memoized(*_INPUTS)
     def lookup_mem(self):
         lookup_query = {
             "model_name": self.fm.base_model_path,
@@ -97,13 +123,15 @@ class HybridEstimator:
 
         lookup_query = format_query(lookup_query, self.lookup_est.get_data_format())
 
-        res = self.lookup_est.run(lookup_query)
+        res = self.lookup_est.lookup(lookup_query)
 
-        if res.empty:
-            return None
+        if res is None:
+            # no measurement of this config, so interpolate between neighbours
+            return self.lookup_est.interpolate(lookup_query, "memory")
 
-        return res["memory"][0:1].item()
+        return res["memory"]
 
+    @memoized(*_INPUTS)
     def calculate_activation_memory(self):
         if not self.fsdp_enabled:
             return self.full_est.calculate_activation_memory()
@@ -155,6 +183,7 @@ class HybridEstimator:
 
         return self.fsdp_est.calculate_optimizer_memory()
 
+    @memoized(*_INPUTS)
     def get_total_mem_estimate(self):
         if not self.fsdp_enabled:
             return self.full_est.get_total_mem_estimate()
@@ -1,10 +1,15 @@
 # Local
 from ...config import FMArguments, HFTrainingArguments, InfraArguments, PeftLoraConfig
 from ...data import format_query
-from ...regressor import LookupRegressor, GetRegressor
+from ...regressor import get_shared_lookup_regressor, get_shared_regressor
 from ...utils import logger
+from ..discovery import find_min_num_gpus, solve_min_num_gpus
+from ..memo import memoized
 from .lora import LoraEstimator
 
+# what lookups and regressions depend on, besides the config
+_INPUTS = ("num_gpus", "ta.per_device_train_batch_size", "fm.block_size")
+
 
 class HybridLoraEstimator:
     def __init__(
@@ -15,6 +20,8 @@ class HybridLoraEstimator:
         lora_args: PeftLoraConfig,
         lookup_data_path,
         model_path,
+        lookup_est=None,
+        reg_est=None,
     ):
 
         logger.info("Memory Lora Hybrid - Initializing")
@@ -26,14 +33,18 @@ class HybridLoraEstimator:
         self.lora_est = LoraEstimator(fm_args, train_args, lora_args)
 
         # Lookup based estimator
-        if lookup_data_path is not None:
-            self.lookup_est = LookupRegressor(lookup_data_path)
+        if lookup_est is not None:
+            self.lookup_est = lookup_est
+        elif lookup_data_path is not None:
+            self.lookup_est = get_shared_lookup_regressor(lookup_data_path)
         else:
             self.lookup_est = None
 
         # Model based estimator
-        if model_path is not None:
-            self.reg_est = GetRegressor(model_path)
+        if reg_est is not None:
+            self.reg_est = reg_est
+        elif model_path is not None:
+            self.reg_est = get_shared_regressor(model_path)
         else:
             self.reg_est = None
 
@@ -44,26 +55,36 @@ class HybridLoraEstimator:
             self.num_gpus = self.ia.numGpusPerPod
 
     def auto_discover_num_gpus(self):
-        num = self.lora_est.calculate_model_memory() / (
-            self.ia.gpu_memory_in_gb * 1024**3
-        )
-        self.num_gpus = int(num) if num > 1 else 1
-
-        trials = 10
-        while trials > 0:
-            mem = self.get_total_mem_estimate()
-            if mem < self.ia.gpu_memory_in_gb * 1024**3:
-                logger.info(
-                    "Memory Lora Hybrid - Discovered num gpus: {0}".format(
-                        self.num_gpus
-                    )
-                )
-                return
+        gpu_memory = self.ia.gpu_memory_in_gb * 1024**3
+
+        def fits(num_gpus):
+            self.num_gpus = num_gpus
+            return self.get_total_mem_estimate() < gpu_memory
+
+        if self.lookup_est is None and self.reg_est is None:
+            # theory only: activations are split across the gpus and the rest is not,
+            # so solve for the number of gpus
+            num_gpus = solve_min_num_gpus(
+                self.lora_est.calculate_gradient_memory()
+                + self.lora_est.calculate_model_memory()
+                + self.lora_est.calculate_optimizer_memory(),
+                self.lora_est.calculate_activation_memory(),
+                gpu_memory,
+            )
+            # guard against rounding right at the boundary
+            if num_gpus is not None and not fits(num_gpus):
+                num_gpus = find_min_num_gpus(fits, num_gpus)
+        else:
+            num = self.lora_est.calculate_model_memory() / gpu_memory
+            num_gpus = find_min_num_gpus(fits, int(num))
 
-            trials -= 1
-            self.num_gpus += 1
+        if num_gpus is None:
+            logger.warning("Memory Lora Hybrid - No suitable num gpus found!")
+            self.num_gpus = -1
+            return
 
-        logger.warning("Memory Lora Hybrid - No suitable num gpus found!")
+        self.num_gpus = num_gpus
+        logger.info("Memory Lora Hybrid - Discovered num gpus: {0}".format(num_gpus))
 
     def calculate_model_memory(self):
         return self.lora_est.calculate_model_memory() / self.num_gpus
@@ -77,6 +98,7 @@ class HybridLoraEstimator:
     def calculate_activation_memory(self):
         return self.lora_est.calculate_activation_memory() / self.num_gpus
 
+    @memoized(*_INPUTS)
     def get_total_mem_estimate(self):
 
         lookup_query_base = {
@@ -94,14 +116,16 @@ class HybridLoraEstimator:
                 lookup_query_base, self.lookup_est.get_data_format()
             )
             logger.debug("Memory Lora Hybrid - Lookup query for lookup_est is: %s", lookup_query)
-            res = self.lookup_est.run(lookup_query)
-            if res.empty:
-                lookup_mem = None
+            res = self.lookup_est.lookup(lookup_query)
+            if res is None:
+                # no measurement of this config, so interpolate between neighbours
+                lookup_mem = self.lookup_est.interpolate(lookup_query, "memory")
                 logger.debug(
-                    "Memory Lora Hybrid - No match was found by lookup, trying reg_est"
+                    "Memory Lora Hybrid - No match was found by lookup, interpolated: %s",
+                    lookup_mem,
                 )
             else:
-                lookup_mem = res["memory"][0:1].item()
+                lookup_mem = res["memory"]
             if lookup_mem is not None:
                 logger.info("Memory Lora Hybrid - Lookup: match found")
                 return lookup_mem
@@ -0,0 +1,218 @@
+# Standard
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import copy
+
+if TYPE_CHECKING:
+    # Third Party
+    from transformers import PretrainedConfig
+
+# Third Party
+import numpy
+
+# Local
+from ...config import PeftLoraConfig
+from ...utils import get_model_manifest, logger, span
+
+# decoder only architectures whose layers are all llama style attention and gated mlp
+LLAMA_LIKE_MODEL_TYPES = ["llama", "mistral", "granite", "qwen2"]
+
+# architectures with a bias on the q, k and v projections only, whatever the config says
+QKV_BIAS_MODEL_TYPES = ["qwen2"]
+
+
+@dataclass
+class LoraParameters:
+    """Parameter counts and adapter shapes of a model with LoRA adapters.
+
+    adapter_shapes is a table with a row of (in_features, out_features) for every
+    adapted linear layer, in model order. self_attn is whether the model names its
+    attention modules self_attn, whose input is shared by the q, k and v projections.
+    """
+
+    num_of_model_params: int
+    num_of_trainable_params: int
+    adapter_shapes: numpy.ndarray
+    self_attn: bool
+
+    # sums over the table, so that estimates do not walk it
+    num_adapters: int = field(init=False)
+    adapter_in_features: int = field(init=False)
+    adapter_out_features: int = field(init=False)
+
+    def __post_init__(self):
+        self.adapter_shapes = numpy.asarray(self.adapter_shapes, dtype=numpy.int64)
+        self.adapter_shapes = self.adapter_shapes.reshape(-1, 2)
+        self.num_adapters = len(self.adapter_shapes)
+        self.adapter_in_features, self.adapter_out_features = (
+            int(x) for x in self.adapter_shapes.sum(axis=0)
+        )
+
+
+def _layer_modules(config: "PretrainedConfig") -> Dict[str, Tuple[int, int, bool]]:
+    # linear layers of a single decoder layer: name -> (in_features, out_features, bias)
+    h = config.hidden_size
+    a = config.num_attention_heads
+    kv = getattr(config, "num_key_value_heads", None) or a
+    head_dim = getattr(config, "head_dim", None) or h // a
+    i = config.intermediate_size
+
+    if config.model_type in QKV_BIAS_MODEL_TYPES:
+        qkv_bias, o_bias = True, False
+    else:
+        qkv_bias = o_bias = bool(getattr(config, "attention_bias", False))
+    mlp_bias = bool(getattr(config, "mlp_bias", False))
+
+    return {
+        "q_proj": (h, a * head_dim, qkv_bias),
+        "k_proj": (h, kv * head_dim, qkv_bias),
+        "v_proj": (h, kv * head_dim, qkv_bias),
+        "o_proj": (a * head_dim, h, o_bias),
+        "gate_proj": (h, i, mlp_bias),
+        "up_proj": (h, i, mlp_bias),
+        "down_proj": (i, h, mlp_bias),
+    }
+
+
+def count_lora_parameters(
+    config: "PretrainedConfig", lora_args: PeftLoraConfig
+) -> Optional[LoraParameters]:
+    """count the parameters of the model with LoRA adapters from its config alone
+
+    Gives the same counts as get_peft_model on the model, without building it.
+
+    Args:
+        config (PretrainedConfig): config of the base model.
+        lora_args (PeftLoraConfig): LoRA config, target_modules must be a list of names.
+
+    Returns:
+        Optional[LoraParameters]: the counts, or None if the architecture or target
+            modules are not supported, in which case the model has to be built.
+    """
+    if config.model_type not in LLAMA_LIKE_MODEL_TYPES:
+        return None
+
+    modules = _layer_modules(config)
+    targets = lora_args.target_modules
+    if isinstance(targets, str) or not set(targets) <= set(modules):
+        return None
+
+    h = config.hidden_size
+    l = config.num_hidden_layers
+    r = lora_args.r
+
+    # two norms per layer
+    layer_params = 2 * h
+    layer_shapes = []
+    for name, (in_features, out_features, bias) in modules.items():
+        layer_params += in_features * out_features + (out_features if bias else 0)
+        if name in targets:
+            layer_shapes.append((in_features, out_features))
+
+    lora_params = sum(r * (i + o) for i, o in layer_shapes)
+
+    # embeddings, the lm head unless tied to them, and the final norm
+    embedding_params = config.vocab_size * h
+    if not getattr(config, "tie_word_embeddings", False):
+        embedding_params *= 2
+
+    return LoraParameters(
+        num_of_model_params=l * (layer_params + lora_params) + embedding_params + h,
+        num_of_trainable_params=l * lora_params,
+        adapter_shapes=numpy.tile(numpy.reshape(layer_shapes, (-1, 2)), (l, 1)),
+        self_attn=True,
+    )
+
+
+def count_lora_parameters_from_manifest(
+    manifest: dict, lora_args: PeftLoraConfig
+) -> Optional[LoraParameters]:
+    """count the parameters of the model with LoRA adapters from its manifest
+
+    Target modules are matched against the linear modules of the manifest the way
+    peft matches them, by full name or by the last parts of the name.
+
+    Returns:
+        Optional[LoraParameters]: the counts, or None if target_modules is not a list
+            of names of linear modules, in which case the model has to be built.
+    """
+    targets = lora_args.target_modules
+    if isinstance(targets, str):
+        return None
+
+    shapes = []
+    matched = set()
+    for name, in_features, out_features in manifest["linear_modules"]:
+        for target in targets:
+            if name == target or name.endswith("." + target):
+                shapes.append((in_features, out_features))
+                matched.add(target)
+                break
+
+    # targets of other module types, eg, embeddings, have other adapters
+    if matched != set(targets):
+        return None
+
+    lora_params = sum(lora_args.r * (i + o) for i, o in shapes)
+
+    return LoraParameters(
+        num_of_model_params=manifest["num_params"] + lora_params,
+        num_of_trainable_params=lora_params,
+        adapter_shapes=shapes,
+        self_attn=any("self_attn" in m[0] for m in manifest["linear_modules"]),
+    )
+
+
+def get_lora_parameters(
+    config: "PretrainedConfig",
+    lora_args: PeftLoraConfig,
+    model_path: Optional[str] = None,
+) -> LoraParameters:
+    """return the parameter counts of the model with LoRA adapters
+
+    Counted from the config where supported, see count_lora_parameters, then from
+    the manifest of the model, if there is one, and otherwise read off a peft model
+    built with empty weights.
+    """
+    params = count_lora_parameters(config, lora_args)
+    if params is not None:
+        return params
+
+    manifest = get_model_manifest(model_path) if model_path is not None else None
+    if manifest is not None:
+        params = count_lora_parameters_from_manifest(manifest, lora_args)
+        if params is not None:
+            return params
+
+    logger.info(
+        "Memory LoRA - Building the peft model of %s to count its parameters",
+        config.model_type,
+    )
+
+    # these take seconds to import, so only do it when a peft model is needed
+    # Third Party
+    from accelerate import init_empty_weights
+    from peft import LoraConfig, get_peft_model
+    from peft.tuners.lora import LoraLayer
+    from transformers import AutoModelForCausalLM
+
+    with span("peft_model"):
+        with init_empty_weights():
+            # the shared config is copied, as building the model may modify it
+            model = AutoModelForCausalLM.from_config(copy.deepcopy(config))
+        # weights are not tied under init_empty_weights, which would count them twice
+        model.tie_weights()
+
+        # cast our lora config dataclass instance into the real peft dataclass fmt
+        peft_model = get_peft_model(model, LoraConfig(**lora_args.__dict__))
+
+    return LoraParameters(
+        num_of_model_params=peft_model.num_parameters(),
+        num_of_trainable_params=peft_model.num_parameters(only_trainable=True),
+        adapter_shapes=[
+            (m.in_features, m.out_features)
+            for m in peft_model.modules()
+            if isinstance(m, LoraLayer)
+        ],
+        self_attn=any("self_attn" in k for k, _ in peft_model.named_parameters()),
+    )
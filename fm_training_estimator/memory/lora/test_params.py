@@ -0,0 +1,126 @@
+# Standard
+import copy
+
+# Third Party
+from accelerate import init_empty_weights
+from peft import LoraConfig, get_peft_model
+from peft.tuners.lora import LoraLayer
+from transformers import (
+    AutoModelForCausalLM,
+    GPT2Config,
+    GraniteConfig,
+    LlamaConfig,
+    MistralConfig,
+    Qwen2Config,
+)
+import numpy
+import pytest
+
+# Local
+from ...config import PeftLoraConfig, parse
+from ..qlora import QLoraEstimator
+from .lora import LoraEstimator
+from .params import count_lora_parameters, get_lora_parameters
+
+sizes = dict(
+    hidden_size=256,
+    intermediate_size=688,
+    num_hidden_layers=3,
+    num_attention_heads=8,
+    vocab_size=1000,
+)
+
+configs = [
+    LlamaConfig(**sizes),
+    LlamaConfig(**sizes, num_key_value_heads=2, tie_word_embeddings=True),
+    LlamaConfig(**sizes, head_dim=48, attention_bias=True, mlp_bias=True),
+    MistralConfig(**sizes, num_key_value_heads=2, head_dim=64),
+    GraniteConfig(**sizes, num_key_value_heads=2),
+    Qwen2Config(**sizes, num_key_value_heads=2),
+]
+
+targets = [
+    ["q_proj", "v_proj"],
+    ["q_proj", "k_proj", "v_proj", "o_proj", "gate_proj", "up_proj", "down_proj"],
+    ["down_proj"],
+]
+
+
+def _from_peft_model(config, lora_args):
+    with init_empty_weights():
+        model = AutoModelForCausalLM.from_config(copy.deepcopy(config))
+    model.tie_weights()
+    peft_model = get_peft_model(model, LoraConfig(**lora_args.__dict__))
+
+    shapes = [
+        [m.in_features, m.out_features]
+        for m in peft_model.modules()
+        if isinstance(m, LoraLayer)
+    ]
+    return (
+        peft_model.num_parameters(),
+        peft_model.num_parameters(only_trainable=True),
+        shapes,
+    )
+
+
+@pytest.mark.parametrize("config", configs, ids=lambda c: c.model_type)
+@pytest.mark.parametrize("target_modules", targets, ids=len)
+def test_count_lora_parameters(config, target_modules):
+    lora_args = PeftLoraConfig(r=8, target_modules=target_modules)
+
+    params = count_lora_parameters(config, lora_args)
+
+    assert (
+        params.num_of_model_params,
+        params.num_of_trainable_params,
+        params.adapter_shapes.tolist(),
+    ) == _from_peft_model(config, lora_args)
+    assert params.self_attn
+    assert params.num_adapters == len(params.adapter_shapes)
+    assert params.adapter_in_features == params.adapter_shapes[:, 0].sum()
+
+
+def test_activation_memory_of_arrays(tmp_path):
+    configs[1].save_pretrained(tmp_path)
+    fm, ta, _, _, la, qla = parse(
+        {
+            "base_model_path": str(tmp_path),
+            "torch_dtype": "bfloat16",
+            "r": 16,
+            "target_modules": ["q_proj", "k_proj", "v_proj", "o_proj"],
+        }
+    )
+
+    for est in [LoraEstimator(fm, ta, la), QLoraEstimator(fm, ta, la, qla)]:
+        b = numpy.array([1, 2, 4, 8])
+        s = numpy.array([128, 256, 512, 1024])
+        expected = []
+        for b_i, s_i in zip(b, s):
+            est.b, est.s = b_i, s_i
+            expected.append(est.calculate_activation_memory())
+        # per token: the shared input, and for every adapter its input and rank
+        assert expected[0] == 128 * (256 + 3 * (4 * 256 + 4 * 16)) * 2
+
+        est.b, est.s = b, s
+        assert est.calculate_activation_memory().tolist() == expected
+
+
+def test_count_lora_parameters_unsupported():
+    lora_args = PeftLoraConfig(r=8, target_modules=["c_attn"])
+    gpt2 = GPT2Config(n_embd=64, n_layer=2, n_head=4, vocab_size=1000)
+
+    assert count_lora_parameters(gpt2, lora_args) is None
+    assert count_lora_parameters(configs[0], lora_args) is None
+    assert (
+        count_lora_parameters(configs[0], PeftLoraConfig(target_modules="all-linear"))
+        is None
+    )
+
+    # falls back to building the model
+    params = get_lora_parameters(gpt2, lora_args)
+    total, trainable, shapes = _from_peft_model(gpt2, lora_args)
+    assert params.num_of_model_params == total
+    assert params.num_of_trainable_params == trainable == 2 * 8 * (64 + 3 * 64)
+    assert params.adapter_shapes.tolist() == shapes
+    assert not params.self_attn
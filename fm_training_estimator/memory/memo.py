@@ -0,0 +1,50 @@
+# Standard
+from typing import Callable
+import functools
+
+
+def _resolve(obj, path: str):
+    # attributes missing on the way, eg, fsdp_est without fsdp, resolve to None
+    for name in path.split("."):
+        obj = getattr(obj, name, None)
+    return obj
+
+
+def memoized(*inputs: str) -> Callable:
+    """memoize a memory component of an estimator
+
+    Results are kept on the estimator, keyed by the method, its arguments and the
+    current values of the given attributes, eg, "num_gpus" or "fsdp_est.num_gpus".
+    A change of one of them, like a new number of gpus, so only selects other entries,
+    and those of the earlier values are still there when it is changed back, as at
+    the end of discovering the number of gpus.
+
+    Results are computed each time where the attributes are not hashable, eg, arrays.
+
+    Args:
+        inputs (str): dotted paths of the attributes of the estimator the result
+            depends on.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            key = (
+                fn.__name__,
+                args,
+                tuple(sorted(kwargs.items())),
+                *(_resolve(self, path) for path in inputs),
+            )
+            try:
+                hash(key)
+            except TypeError:
+                return fn(self, *args, **kwargs)
+
+            memo = self.__dict__.setdefault("_memo", {})
+            if key not in memo:
+                memo[key] = fn(self, *args, **kwargs)
+            return memo[key]
+
+        return wrapper
+
+    return decorator
@@ -7,10 +7,15 @@ from ...config import (
     PeftQLoraConfig,
 )
 from ...data import format_query
-from ...regressor import LookupRegressor, GetRegressor
+from ...regressor import get_shared_lookup_regressor, get_shared_regressor
 from ...utils import logger
+from ..discovery import find_min_num_gpus
+from ..memo import memoized
 from .qlora import QLoraEstimator
 
+# what lookups and regressions depend on, besides the config
+_INPUTS = ("num_gpus", "ta.per_device_train_batch_size", "fm.block_size")
+
 
 class HybridQLoraEstimator:
     def __init__(
@@ -22,6 +27,8 @@ class HybridQLoraEstimator:
         qlora_args: PeftQLoraConfig,
         lookup_data_path,
         model_path,
+        lookup_est=None,
+        reg_est=None,
     ):
 
         logger.info("Memory QLoRA Hybrid - Initializing")
@@ -33,14 +40,18 @@ class HybridQLoraEstimator:
         self.qlora_est = QLoraEstimator(fm_args, train_args, lora_args, qlora_args)
 
         # Lookup based estimator
-        if lookup_data_path is not None:
-            self.lookup_est = LookupRegressor(lookup_data_path)
+        if lookup_est is not None:
+            self.lookup_est = lookup_est
+        elif lookup_data_path is not None:
+            self.lookup_est = get_shared_lookup_regressor(lookup_data_path)
         else:
             self.lookup_est = None
 
         # Model based estimator
-        if model_path is not None:
-            self.reg_est = GetRegressor(model_path)
+        if reg_est is not None:
+            self.reg_est = reg_est
+        elif model_path is not None:
+            self.reg_est = get_shared_regressor(model_path)
         else:
             self.reg_est = None
 
@@ -51,26 +62,23 @@ class HybridQLoraEstimator:
             self.num_gpus = self.ia.numGpusPerPod
 
     def auto_discover_num_gpus(self):
-        num = self.qlora_est.calculate_model_memory() / (
-            self.ia.gpu_memory_in_gb * 1024**3
-        )
-        self.num_gpus = int(num) if num > 1 else 1
-
-        trials = 10
-        while trials > 0:
-            mem = self.get_total_mem_estimate()
-            if mem < self.ia.gpu_memory_in_gb * 1024**3:
-                logger.debug(
-                    "Memory QLoRA Hybrid - Discovered num gpus: {0}".format(
-                        self.num_gpus
-                    )
-                )
-                return
-
-            trials -= 1
-            self.num_gpus += 1
-
-        logger.warning("Memory QLoRA Hybrid - No suitable num gpus found!")
+        gpu_memory = self.ia.gpu_memory_in_gb * 1024**3
+
+        def fits(num_gpus):
+            self.num_gpus = num_gpus
+            return self.get_total_mem_estimate() < gpu_memory
+
+        # there is no theory fall back for qlora, so always search
+        num = self.qlora_est.calculate_model_memory() / gpu_memory
+        num_gpus = find_min_num_gpus(fits, int(num))
+
+        if num_gpus is None:
+            logger.warning("Memory QLoRA Hybrid - No suitable num gpus found!")
+            self.num_gpus = -1
+            return
+
+        self.num_gpus = num_gpus
+        logger.debug("Memory QLoRA Hybrid - Discovered num gpus: {0}".format(num_gpus))
 
     def calculate_model_memory(self):
         return self.qlora_est.calculate_model_memory() / self.num_gpus
@@ -84,6 +92,7 @@ class HybridQLoraEstimator:
     def calculate_activation_memory(self):
         return self.qlora_est.calculate_activation_memory() / self.num_gpus
 
+    @memoized(*_INPUTS)
     def get_total_mem_estimate(self):
 
         lookup_query_base = {
@@ -100,11 +109,12 @@ class HybridQLoraEstimator:
             lookup_query = format_query(
                 lookup_query_base, self.lookup_est.get_data_format()
             )
-            res = self.lookup_est.run(lookup_query)
-            if res.empty:
-                lookup_mem = None
+            res = self.lookup_est.lookup(lookup_query)
+            if res is None:
+                # no measurement of this config, so interpolate between neighbours
+                lookup_mem = self.lookup_est.interpolate(lookup_query, "memory")
             else:
-                lookup_mem = res["memory"][0:1].item()
+                lookup_mem = res["memory"]
             if lookup_mem is not None:
                 logger.debug("Memory QLoRA Hybrid - match found")
                 return lookup_mem
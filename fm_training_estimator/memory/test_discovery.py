@@ -0,0 +1,102 @@
+# Third Party
+from transformers import LlamaConfig
+
+# Local
+from ..config import parse
+from .discovery import find_min_num_gpus, solve_min_num_gpus
+from .hybrid import HybridEstimator
+
+
+def _counted(min_num_gpus):
+    calls = []
+
+    def fits(n):
+        calls.append(n)
+        return n >= min_num_gpus
+
+    return fits, calls
+
+
+def test_find_min_num_gpus():
+    for guess in [1, 5, 37, 300, 1024]:
+        for expected in [1, 2, 36, 37, 38, 299, 500, 1024]:
+            fits, calls = _counted(expected)
+            assert find_min_num_gpus(fits, guess) == expected
+            # logarithmic, not linear, in the distance from the guess
+            assert len(calls) <= 2 * abs(expected - guess).bit_length() + 2
+
+    # nothing fits within the range
+    fits, calls = _counted(2000)
+    assert find_min_num_gpus(fits, 4) is None
+    assert max(calls) == 1024
+    fits, _ = _counted(20)
+    assert find_min_num_gpus(fits, 4, max_num_gpus=16) is None
+
+    # guesses out of range are clamped
+    fits, _ = _counted(3)
+    assert find_min_num_gpus(fits, -2) == 3
+
+
+def test_find_min_num_gpus_non_monotonic():
+    # eg, a regression model predicting less memory on 3 gpus than on 4 to 9
+    def fits(n):
+        return n == 3 or n >= 10
+
+    for guess in [1, 3, 4, 8, 64]:
+        num_gpus = find_min_num_gpus(fits, guess)
+        # some boundary is found, not necessarily the first one
+        assert num_gpus in [3, 10]
+        assert fits(num_gpus)
+        assert not fits(num_gpus - 1)
+
+
+def test_solve_min_num_gpus():
+    assert solve_min_num_gpus(10, 100, 60) == 3
+    # exactly at the limit does not fit
+    assert solve_min_num_gpus(10, 100, 110) == 2
+    assert solve_min_num_gpus(10, 0, 60) == 1
+    assert solve_min_num_gpus(60, 100, 60) is None
+    assert solve_min_num_gpus(0, 10_000, 1) is None
+
+
+def test_hybrid_discovery(tmp_path):
+    LlamaConfig(
+        hidden_size=8192,
+        intermediate_size=28672,
+        num_hidden_layers=80,
+        num_attention_heads=64,
+        num_key_value_heads=8,
+    ).save_pretrained(tmp_path)
+
+    found = []
+    for fsdp in ["full_shard", "shard_grad_op"]:
+        for b in [1, 4, 256]:
+            fm, ta, ia, _, _, _ = parse(
+                {
+                    "base_model_path": tmp_path.as_posix(),
+                    "gpu_memory_in_gb": 24,
+                    "fsdp": fsdp,
+                    "per_device_train_batch_size": b,
+                    "block_size": 1024,
+                    "numGpusPerPod": 0,
+                    "torch_dtype": "bfloat16",
+                    "gradient_checkpointing": True,
+                }
+            )
+            est = HybridEstimator(fm, ta, ia, None, None)
+            num_gpus = est.fsdp_est.get_number_of_gpus()
+
+            # the closed form gives the smallest number of gpus that fits
+            def fits(n):
+                est.fsdp_est.set_number_of_gpus(n)
+                return est.get_total_mem_estimate() < 24 * 1024**3
+
+            if num_gpus == -1:
+                assert not fits(1024)
+            else:
+                assert fits(num_gpus)
+                assert num_gpus == 1 or not fits(num_gpus - 1)
+                found.append(num_gpus)
+
+    # more gpus than the 10 the discovery used to give up after
+    assert max(found) > 10
@@ -0,0 +1,94 @@
+# Third Party
+from transformers import LlamaConfig
+import numpy
+
+# Local
+from ..config import parse
+from .hybrid import HybridEstimator
+from .lora import HybridLoraEstimator
+from .memo import memoized
+
+
+class Component:
+    def __init__(self):
+        self.num_gpus = 1
+        self.calls = 0
+
+    @memoized("num_gpus")
+    def size(self, readable=False):
+        self.calls += 1
+        return str(100 / self.num_gpus) if readable else 100 / self.num_gpus
+
+
+def test_memoized():
+    c = Component()
+    assert c.size() == c.size() == 100
+    assert c.size(readable=True) == "100.0"
+    assert c.calls == 2
+
+    # a new number of gpus is computed, an earlier one is served from the memo
+    c.num_gpus = 4
+    assert c.size() == 25
+    c.num_gpus = 1
+    assert c.size() == 100
+    assert c.calls == 3
+
+    # arrays are not hashable, so not memoized
+    c.num_gpus = numpy.array([1, 4])
+    assert c.size().tolist() == c.size().tolist() == [100, 25]
+    assert c.calls == 5
+
+
+class CountingRegressor:
+    def __init__(self):
+        self.calls = 0
+
+    def get_data_format(self):
+        return "v1"
+
+    def run(self, params, target):
+        self.calls += 1
+        return 2 * 1024**3
+
+
+def test_hybrid_memo(tmp_path):
+    LlamaConfig(
+        hidden_size=4096,
+        intermediate_size=11008,
+        num_hidden_layers=32,
+        num_attention_heads=32,
+    ).save_pretrained(tmp_path)
+    fm, ta, ia, _, la, _ = parse(
+        {
+            "base_model_path": tmp_path.as_posix(),
+            "torch_dtype": "bfloat16",
+            "gradient_checkpointing": True,
+            "per_device_train_batch_size": 4,
+            "numGpusPerPod": 0,
+            "gpu_memory_in_gb": 40,
+        }
+    )
+
+    reg = CountingRegressor()
+    est = HybridEstimator(fm, ta, ia, None, None, reg_est=reg)
+    discovery_calls = reg.calls
+    num_gpus = est.fsdp_est.num_gpus
+    assert num_gpus > 1
+
+    # the breakdown after discovery reuses its estimates
+    est.get_total_mem_estimate()
+    est.calculate_activation_memory()
+    est.calculate_gradient_memory()
+    assert reg.calls == discovery_calls
+
+    # a new number of gpus is estimated once
+    est.fsdp_est.set_number_of_gpus(num_gpus + 100)
+    est.get_total_mem_estimate()
+    est.calculate_activation_memory()
+    assert reg.calls == discovery_calls + 1
+
+    reg = CountingRegressor()
+    est = HybridLoraEstimator(fm, ta, ia, la, None, None, reg_est=reg)
+    assert est.num_gpus == 1
+    assert est.get_total_mem_estimate() == est.get_total_mem_estimate()
+    assert reg.calls == 1
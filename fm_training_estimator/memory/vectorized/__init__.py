@@ -0,0 +1,4 @@
+# Local
+from .vectorized import VectorizedMemoryEstimator
+
+__all__ = ["VectorizedMemoryEstimator"]
@@ -0,0 +1,95 @@
+# Third Party
+from transformers import LlamaConfig
+import numpy
+import pytest
+
+# Local
+from ...config import parse
+from ..fsdp import FSDPEstimator
+from ..full import FullParameterTuningEstimator
+from .vectorized import VectorizedMemoryEstimator
+
+COMPONENTS = [
+    "activation_memory",
+    "gradient_memory",
+    "model_memory",
+    "optimizer_memory",
+    "total_mem_estimate",
+]
+
+
+def _parse(model_path, **kwargs):
+    fm, ta, _, _, _, _ = parse({"base_model_path": model_path, **kwargs})
+    return fm, ta
+
+
+def _scalar(model_path, b, s, g, precision, gc, fsdp):
+    fm, ta = _parse(
+        model_path,
+        per_device_train_batch_size=int(b),
+        block_size=int(s),
+        torch_dtype=precision,
+        gradient_checkpointing=bool(gc),
+        fsdp=fsdp,
+    )
+    est = FullParameterTuningEstimator(fm, ta)
+    if fsdp != "":
+        est = FSDPEstimator(fm, ta, est, 80 * 1024**3)
+        est.set_number_of_gpus(int(g))
+
+    return {
+        "activation_memory": est.calculate_activation_memory(),
+        "gradient_memory": est.calculate_gradient_memory(),
+        "model_memory": est.calculate_model_memory(),
+        "optimizer_memory": est.calculate_optimizer_memory(),
+        "total_mem_estimate": est.get_total_mem_estimate(),
+    }
+
+
+def test_vectorized(tmp_path):
+    LlamaConfig(num_hidden_layers=4, max_position_embeddings=2048).save_pretrained(
+        tmp_path
+    )
+    model_path = tmp_path.as_posix()
+
+    grid = [
+        a.ravel()
+        for a in numpy.meshgrid(
+            [1, 4],
+            [512, 4096],
+            [1, 8],
+            ["float32", "bfloat16"],
+            [False, True],
+            ["", "full_shard", "shard_grad_op"],
+            indexing="ij",
+        )
+    ]
+    est = VectorizedMemoryEstimator(*_parse(model_path))
+    res = est.estimate(*grid)
+
+    # every configuration matches the scalar estimators
+    for i, point in enumerate(zip(*grid)):
+        expected = _scalar(model_path, *point)
+        for k in COMPONENTS:
+            assert res[k][i] == pytest.approx(expected[k])
+
+    # scalars are broadcast, and the defaults come from the args, eg, float32
+    res = est.estimate([1, 2, 4], 1024, num_gpus=2)
+    assert res["total_mem_estimate"].shape == (3,)
+    assert res["model_memory"][0] == est.num_of_model_params * 4
+    assert res["activation_memory"][2] == 4 * res["activation_memory"][0]
+
+
+def test_vectorized_number_of_gpus(tmp_path):
+    LlamaConfig(num_hidden_layers=4).save_pretrained(tmp_path)
+    fm, ta = _parse(tmp_path.as_posix(), fsdp="full_shard")
+    gpu_memory = 1024**3
+
+    est = VectorizedMemoryEstimator(fm, ta)
+    res = est.estimate_number_of_gpus([1, 2, 4, 8], 2048, gpu_memory)
+
+    for b, num_gpus in zip([1, 2, 4, 8], res):
+        ta.per_device_train_batch_size = b
+        fm.block_size = 2048
+        fsdp = FSDPEstimator(fm, ta, FullParameterTuningEstimator(fm, ta), gpu_memory)
+        assert fsdp.estimate_number_of_gpus() == num_gpus
@@ -0,0 +1,194 @@
+# Third Party
+from transformers.training_args import OptimizerNames
+import numpy
+
+# Local
+from ...config import FMArguments, HFTrainingArguments
+from ...utils import get_size_from_precision
+from ..full import FullParameterTuningEstimator
+
+
+def _activation_multiplier(precision: str) -> float:
+    # activations are assumed in half precision, float32 doubles them
+    return 2 if precision == "float32" else 1
+
+
+def _gradient_bytes(precision: str) -> float:
+    if precision == "float32":
+        return 4
+    if precision in ("float16", "bfloat16"):
+        return 2
+    raise ValueError("no support for the precision")
+
+
+class VectorizedMemoryEstimator:
+    """Theory memory of full fine tuning, with and without FSDP, for arrays of configurations.
+
+    Evaluates the formulas of FullParameterTuningEstimator and FSDPEstimator element-wise
+    over arrays of batch size, seq len, number of gpus, precision, gradient checkpointing
+    and fsdp strategy. The model config is loaded once, so any number of configurations
+    of the same model and optimizer are estimated in a single call.
+    """
+
+    def __init__(self, fm_args: FMArguments, train_args: HFTrainingArguments):
+        base = FullParameterTuningEstimator(fm_args, train_args)
+
+        self.h = base.h
+        self.l = base.l
+        self.a = base.a
+        self.model_max_length = base.model_max_length
+        self.num_of_model_params = base.num_of_model_params
+        self.num_of_trainable_params = base.num_of_trainable_params
+        self.optimizer = base.optimizer
+
+        # used where the arrays are not given
+        self.precision = base.precision
+        self.gradient_checkpointing = train_args.gradient_checkpointing
+
+    def _per_precision(self, precision, fn) -> numpy.ndarray:
+        # the precision functions are evaluated once per distinct precision
+        values, idx = numpy.unique(precision, return_inverse=True)
+        return numpy.array([fn(p) for p in values], dtype=float)[idx].reshape(
+            precision.shape
+        )
+
+    def _optimizer_bytes(self, precision: str) -> float:
+        # same optimizers as FullParameterTuningEstimator.calculate_optimizer_memory
+        if self.optimizer.value.startswith("adamw"):
+            if precision == "float32":
+                return 8
+            if precision in ("float16", "bfloat16"):
+                return 4
+            return 0
+        if self.optimizer == OptimizerNames.SGD:
+            return 4
+        raise NotImplementedError("computation for optimizer is not implemented")
+
+    def _broadcast(self, batch_size, seq_len, num_gpus, precision, gc, fsdp):
+        if precision is None:
+            precision = self.precision
+        if gc is None:
+            gc = self.gradient_checkpointing
+        if fsdp is None:
+            fsdp = ""
+
+        b, s, g, precision, gc, fsdp = numpy.broadcast_arrays(
+            numpy.asarray(batch_size),
+            numpy.asarray(seq_len),
+            numpy.asarray(num_gpus),
+            numpy.asarray(precision),
+            numpy.asarray(gc, dtype=bool),
+            numpy.asarray(fsdp),
+        )
+        s = numpy.minimum(s, self.model_max_length)
+
+        return b, s, g, precision, gc, fsdp
+
+    def _unsharded(self, b, s, precision, gc) -> dict:
+        h, l, a = self.h, self.l, self.a
+
+        # see https://blog.eleuther.ai/transformer-math/#activations-and-batch-size
+        # worst case, without tensor and sequence parallelism
+        act = (s * b * h * l) * (34 + 5 * (a * s) / h)
+        act = numpy.where(gc, act / l, act)
+        act = act * self._per_precision(precision, _activation_multiplier)
+
+        return {
+            "activation_memory": act,
+            "gradient_memory": self.num_of_trainable_params
+            * self._per_precision(precision, _gradient_bytes),
+            "model_memory": self.num_of_model_params
+            * self._per_precision(precision, get_size_from_precision),
+            "optimizer_memory": self.num_of_trainable_params
+            * self._per_precision(precision, self._optimizer_bytes),
+        }
+
+    def estimate(
+        self,
+        batch_size,
+        seq_len,
+        num_gpus=1,
+        precision=None,
+        gradient_checkpointing=None,
+        fsdp=None,
+    ) -> dict:
+        """return the memory components in bytes per gpu, for every configuration
+
+        All arguments are arrays, or scalars which apply to every configuration, and are
+        broadcast against each other.
+
+        Args:
+            batch_size: per device batch size.
+            seq_len: sequence length, capped at the max length of the model.
+            num_gpus: number of gpus, only used with fsdp.
+            precision: precision of the model, eg, "bfloat16". Defaults to the torch_dtype
+                of the fm args.
+            gradient_checkpointing: whether activations are recomputed. Defaults to the
+                setting in the training args.
+            fsdp: fsdp sharding strategy, eg, "full_shard" or "shard_grad_op", or an empty
+                string for no sharding. Defaults to no sharding.
+
+        Returns:
+            dict: arrays of activation_memory, gradient_memory, model_memory,
+                optimizer_memory and their sum total_mem_estimate.
+        """
+        b, s, g, precision, gc, fsdp = self._broadcast(
+            batch_size, seq_len, num_gpus, precision, gradient_checkpointing, fsdp
+        )
+        res = self._unsharded(b, s, precision, gc)
+
+        # fsdp shards gradients and optimizer states, and the model unless only
+        # those two are sharded. Activations are not sharded.
+        sharded = fsdp != ""
+        res["gradient_memory"] = numpy.where(
+            sharded, res["gradient_memory"] / g, res["gradient_memory"]
+        )
+        res["optimizer_memory"] = numpy.where(
+            sharded, res["optimizer_memory"] / g, res["optimizer_memory"]
+        )
+        res["model_memory"] = numpy.where(
+            sharded & (fsdp != "shard_grad_op"),
+            res["model_memory"] / g,
+            res["model_memory"],
+        )
+
+        res["total_mem_estimate"] = (
+            res["activation_memory"]
+            + res["gradient_memory"]
+            + res["model_memory"]
+            + res["optimizer_memory"]
+        )
+        return res
+
+    def estimate_number_of_gpus(
+        self,
+        batch_size,
+        seq_len,
+        gpu_memory,
+        precision=None,
+        gradient_checkpointing=None,
+        fsdp="full_shard",
+    ) -> numpy.ndarray:
+        """return the number of gpus needed with fsdp, for every configuration
+
+        Same formula as FSDPEstimator.estimate_number_of_gpus, which leaves out 1% of
+        the gpu memory. The arguments are as in estimate, with gpu_memory in bytes.
+        Where the unsharded model alone does not fit with shard_grad_op, the result is
+        not positive.
+        """
+        b, s, _, precision, gc, fsdp = self._broadcast(
+            batch_size, seq_len, 1, precision, gradient_checkpointing, fsdp
+        )
+        gpu_memory = numpy.asarray(gpu_memory, dtype=float)
+        res = self._unsharded(b, s, precision, gc)
+
+        sharded_memory = (
+            res["activation_memory"] + res["gradient_memory"] + res["optimizer_memory"]
+        )
+        shard_model = fsdp != "shard_grad_op"
+        sharded_memory = numpy.where(
+            shard_model, sharded_memory + res["model_memory"], sharded_memory
+        )
+        available = gpu_memory * 0.99 - numpy.where(shard_model, 0, res["model_memory"])
+
+        return numpy.ceil(sharded_memory / available).astype(int)
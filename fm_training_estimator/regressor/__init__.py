@@ -1,8 +1,24 @@
-# Local
-from .lookup import LookupRegressor
-from .xgboost import XGBoostRegressor
-from .linear import LinearRegressor
-#from .arise import AriseRegressor
-from .min_gpu import MinGpuRecommenderCaller
-
-from .dispatch import GetRegressor
+# Standard
+import importlib
+
+# regressors are imported on first use, as xgboost, sklearn and the min gpu
+# recommender are slow to import and most runs need at most one of them
+_lazy_attrs = {
+    "LookupRegressor": ".lookup",
+    "XGBoostRegressor": ".xgboost",
+    "LinearRegressor": ".linear",
+    # "AriseRegressor": ".arise",
+    "MinGpuRecommenderCaller": ".min_gpu",
+    "GetRegressor": ".dispatch",
+    "clear_shared_regressors": ".registry",
+    "get_shared_lookup_regressor": ".registry",
+    "get_shared_regressor": ".registry",
+}
+
+__all__ = list(_lazy_attrs)
+
+
+def __getattr__(name):
+    if name in _lazy_attrs:
+        return getattr(importlib.import_module(_lazy_attrs[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
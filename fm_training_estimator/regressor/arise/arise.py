@@ -1,21 +1,46 @@
+import io
 import os
 import tempfile
 import shutil
+import joblib
 import pandas
-import yaml
 import zipfile
-from functools import lru_cache
 
 from arise_predictions.preprocessing import job_parser
 from arise_predictions.utils import constants, utils
 from arise_predictions.auto_model.build_models import auto_build_models, get_estimators_config
-from arise_predictions.perform_predict.predict import demo_predict, get_predict_config_from_dict
 
 from ...data import lookup_format_version, get_format_by_version
+from ...utils import timed
+from ..cache import PredictionCache
 
 class AriseRegressor:
     def __init__(self, model_path=None):
-        self.model_path = model_path
+        self.data_format = None
+        # target variable -> the best ranked estimator of it
+        self.estimators = {}
+        self._predictions = PredictionCache()
+
+        if model_path is not None:
+            self.load(model_path)
+
+    def load(self, model_path):
+        # model_path is the path of the model zip, or the zip itself, already open
+        if not isinstance(model_path, zipfile.ZipFile):
+            with zipfile.ZipFile(model_path) as model_zip:
+                return self.load(model_zip)
+
+        self.data_format = model_path.read("estimator_data_version").decode()
+
+        # load the estimator arise would pick for each target, once, from the zip
+        rankings = pandas.read_csv(io.BytesIO(model_path.read(constants.AM_RANKINGS_FILE)))
+        self.estimators = {}
+        for target in rankings[constants.AM_COL_TARGET].unique():
+            name, linear = utils.get_best_estimators(rankings, target, linear_filter=False)
+            estimator_file = utils.get_estimator_file_name(
+                "linear" if linear else "nonlinear", name, target)
+            self.estimators[target] = joblib.load(io.BytesIO(model_path.read(estimator_file)))
+        self._predictions.clear()
 
     def preprocess(self, workdir, job_spec):
         inputs = sorted(list(job_spec[0]))
@@ -94,53 +119,39 @@ class AriseRegressor:
             # copy the model to required destination
             shutil.copy2(os.path.join(workdir, "ARISE-auto-models.zip"), model_path)
 
+        # ready to run, as the other regressors are after training
+        self.load(model_path)
+
     def get_columns(self):
         col_str = get_format_by_version(self.get_data_format()).X
         return col_str.split(",")
 
-    def execute_predict(self, workdir, js, predict_config, model_file_name):
-        return demo_predict(
-            original_data=None,
-            config=get_predict_config_from_dict(predict_config),
-            estimator_path=model_file_name,
-            feature_engineering=js[6],
-            metadata_parser_class_name=js[7],
-            metadata_path=model_file_name,
-            output_path=os.path.join(workdir, constants.PRED_OUTPUT_PATH_SUFFIX))
-
     def run(self, X, y):
-        cols = self.get_columns()
-        input_vars = []
-        for k, v in zip(cols, X):
-            input_vars.append({k: v})
-
-        with tempfile.TemporaryDirectory() as workdir:
-            # TODO: get the right value for the "greater is better" variable
-            est_config = {"target_variable": y, "greater_is_better": True}
-            predict_config = {"fixed_values": input_vars,
-                              "variable_values": [],
-                              "estimators": [est_config]}
-
-            job_spec = {"job-metadata-inputs": {}, "job-metadata-outputs": [y]}
-            for h in cols:
-                job_spec["job-metadata-inputs"][h] = 0
+        return self.run_all(X)[y]
+
+    def _predict(self, data, y):
+        # arise fits on the inputs in sorted order, see preprocess, and estimators
+        # only take the columns in the order they were fitted on
+        est = self.estimators[y]
+        columns = getattr(est, "feature_names_in_", None)
+        if columns is None:
+            columns = sorted(data.columns)
+        return est.predict(data[list(columns)])
+
+    @timed("regressor")
+    def run_all(self, X):
+        """predict all targets of one row, returning a dict of target name to prediction"""
+        def predict():
+            data = pandas.DataFrame([X], columns=self.get_columns())
+            return {y: self._predict(data, y)[0] for y in self.estimators}
+
+        return self._predictions.get(X, predict)
+
+    @timed("regressor")
+    def run_batch(self, rows, targets):
+        """predict many rows in one call, returning a dict of target name to array of predictions"""
+        data = pandas.DataFrame(list(rows), columns=self.get_columns())
+        return {y: self._predict(data, y) for y in targets}
 
-            shutil.copy2(self.model_path, workdir)
-            model_file_name = os.path.join(workdir, os.path.basename(self.model_path))
- 
-            js = job_parser.parse_job_spec(job_spec)
-            self.execute_predict(workdir, js, predict_config, model_file_name)
-
-            # now read the result
-            res_file = os.path.join(workdir, "ARISE-predictions", "all-predictions.csv")
-            res = pandas.read_csv(res_file)
-
-            return res[y][0]
-
-    @lru_cache
     def get_data_format(self):
-        with zipfile.ZipFile(self.model_path) as model_zip:
-            with model_zip.open("estimator_data_version", 'r') as edv:
-                dv = edv.read().decode()
-
-        return dv
+        return self.data_format
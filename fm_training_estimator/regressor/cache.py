@@ -0,0 +1,71 @@
+# Standard
+from collections import OrderedDict
+from typing import Callable, Optional
+import os
+import threading
+
+
+def get_default_cache_size() -> int:
+    """return how many queries a regressor keeps the predictions of, by default
+
+    Set the environment variable `ESTIMATOR_PREDICTION_CACHE_SIZE` to change it, or
+    to 0 to predict every query again.
+    """
+    return int(os.getenv("ESTIMATOR_PREDICTION_CACHE_SIZE", "4096"))
+
+
+def _key(X):
+    # queries are lists of values, or dicts for the min gpu recommender
+    if isinstance(X, dict):
+        return tuple(X.items())
+    return tuple(X)
+
+
+class PredictionCache:
+    """The predictions of all targets of the queries a regressor ran last.
+
+    Regressors are shared by the estimators of a process, see `get_shared_regressor`,
+    and so is their cache: the estimators asking for different targets of the same
+    query, eg, memory and tokens per second, run the model once. Least recently used
+    queries are dropped beyond maxsize. The cache is thread safe.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = get_default_cache_size() if maxsize is None else maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, X, predict: Callable[[], dict]) -> dict:
+        """return the predictions of X, calling predict only if they are not cached
+
+        Returns:
+            dict: target name -> prediction, a copy the caller may modify
+        """
+        try:
+            key = _key(X)
+            hash(key)
+        except TypeError:
+            # eg, a list in a query, not worth caching
+            return predict()
+
+        with self._lock:
+            res = self._entries.get(key)
+            if res is not None:
+                self._entries.move_to_end(key)
+                return dict(res)
+
+        # predicting is done outside the lock, a concurrent miss at worst predicts twice
+        res = predict()
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._entries[key] = res
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return dict(res)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
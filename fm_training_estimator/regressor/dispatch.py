@@ -1,21 +1,28 @@
 import zipfile
 
-from .xgboost import XGBoostRegressor
-from .linear import LinearRegressor
-from .min_gpu import MinGpuRecommenderCaller
-#from .arise import AriseRegressor
 
 def GetRegressor(model_path):
+    # the zip is opened once, the regressors load from it while it is open
     with zipfile.ZipFile(model_path, mode='r') as model_zip:
         mt = model_zip.read("model_type").decode()
 
+        # only import the libraries of the model type in use, they are slow to import
         if mt == "linear":
-            return LinearRegressor(model_path)
+            from .linear import LinearRegressor
+
+            return LinearRegressor(model_zip)
         elif mt == "xgboost":
-            return XGBoostRegressor(model_path)
-        elif mt == "mingpu":
-            return MinGpuRecommenderCaller()
+            from .xgboost import XGBoostRegressor
+
+            return XGBoostRegressor(model_zip)
 #        elif mt == "arise":
-#            return AriseRegressor(model_path)
-        else:
-            raise ValueError("Unknown model type found", mt)
+#            from .arise import AriseRegressor
+#
+#            return AriseRegressor(model_zip)
+
+    if mt == "mingpu":
+        from .min_gpu import MinGpuRecommenderCaller
+
+        return MinGpuRecommenderCaller()
+    else:
+        raise ValueError("Unknown model type found", mt)
@@ -1,4 +1,4 @@
-import os
+import io
 import zipfile
 import tempfile
 
@@ -10,26 +10,58 @@ import joblib
 
 # Local
 from ...data import lookup_format_version, get_format_by_version
+from ...utils import timed
+from .. import tuning
+from ..cache import PredictionCache
 
 
 class LinearRegressor:
+    # searched by tune, around the defaults
+    PARAM_GRID = {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [8, 16, None],
+        "min_samples_leaf": [1, 2, 4],
+    }
+
     def __init__(self, model_path=None):
         self.model = RandomForestRegressor()
         self.cat_enc = OneHotEncoder(sparse_output=False).set_output(transform="pandas")
+        self._predictions = PredictionCache()
 
         if model_path is not None:
             self.load(model_path)
 
     def load(self, model_path):
-        with tempfile.TemporaryDirectory() as mdir:
+        # model_path is the path of the model zip, or the zip itself, already open
+        if not isinstance(model_path, zipfile.ZipFile):
             with zipfile.ZipFile(model_path) as model_zip:
-                model_zip.extractall(mdir)
+                return self.load(model_zip)
+
+        # read the members straight from the zip, nothing is extracted
+        self.model = joblib.load(io.BytesIO(model_path.read("model.json")))
+        self.cat_enc = joblib.load(io.BytesIO(model_path.read("cat_enc.json")))
+        self._predictions.clear()
+
+    def _encode_training_data(self, data, y_headers):
+        # encode category columns
+        cat_feats = data.dtypes[data.dtypes=='object'].index.values.tolist()
+        ecats = self.cat_enc.fit_transform(data[cat_feats])
 
-            path_m = os.path.join(mdir, "model.json")
-            self.model = joblib.load(path_m)
+        data = data.drop(columns=cat_feats)
+        data = pandas.concat([data, ecats], axis=1)
+
+        return data.drop(columns=y_headers), data[y_headers]
 
-            path_e = os.path.join(mdir, "cat_enc.json")
-            self.cat_enc = joblib.load(path_e)
+    def tune(self, data_path: str, y_headers: list[str], folds: int = 5, n_jobs: int = -1):
+        """search the params of the model with cross validation, see `regressor.tuning.tune`
+
+        The picked params are set on the model, for the next train.
+        """
+        X, Y = self._encode_training_data(pandas.read_csv(data_path), y_headers)
+
+        res = tuning.tune(self.model, self.PARAM_GRID, X, Y, folds=folds, n_jobs=n_jobs)
+        self.model.set_params(**res["params"])
+        return res
 
     def train(self, data_path: str, model_path: str, y_headers: list[str]):
         data = pandas.read_csv(data_path)
@@ -40,15 +72,7 @@ class LinearRegressor:
         # obtain the data format metadata
         data_keys = ",".join(list(data.columns.values))
 
-        # encode category columns
-        cat_feats = data.dtypes[data.dtypes=='object'].index.values.tolist()
-        ecats = self.cat_enc.fit_transform(data[cat_feats])
-
-        data = data.drop(columns=cat_feats)
-        data = pandas.concat([data, ecats], axis=1)
-
-        X = data.drop(columns=y_headers)
-        Y = data[y_headers]
+        X, Y = self._encode_training_data(data, y_headers)
 
         self.model.fit(X, Y)
 
@@ -77,22 +101,38 @@ class LinearRegressor:
             model_zip.write(buf_e.name, 'cat_enc.json')
             model_zip.write(buf_mt.name, 'model_type')
 
+        self._predictions.clear()
+
     def run(self, X, y):
-        # convert input data array into form suitable to feed in
+        return self.run_all(X)[y]
 
-        # add column names
-        data = pandas.DataFrame([X], columns=self.model.metadata['feature_names'])
+    @timed("regressor")
+    def run_all(self, X):
+        """predict all targets of one row, returning a dict of target name to prediction"""
+        def predict():
+            y_headers = get_format_by_version(self.get_data_format()).Y.split(",")
+            return {y: res[0] for y, res in self._predict([X], y_headers).items()}
 
-        # encode category columns
-        cat_feats = data.dtypes[data.dtypes=='object'].index.values.tolist()
+        return self._predictions.get(X, predict)
+
+    @timed("regressor")
+    def run_batch(self, rows, targets):
+        """predict many rows in one call, returning a dict of target name to array of predictions"""
+        return self._predict(rows, targets)
+
+    def _predict(self, rows, targets):
+        data = pandas.DataFrame(list(rows), columns=self.model.metadata['feature_names'])
+
+        # encode category columns, all rows at once
+        cat_feats = list(self.cat_enc.feature_names_in_)
         ecats = self.cat_enc.transform(data[cat_feats])
 
         data = data.drop(columns=cat_feats)
         data = pandas.concat([data, ecats], axis=1)
 
-        res = self.model.predict(data)
-        col_idx = get_format_by_version(self.get_data_format()).Y.split(",").index(y)
-        return res[0][col_idx]
+        res = self.model.predict(data).reshape(len(data), -1)
+        y_headers = get_format_by_version(self.get_data_format()).Y.split(",")
+        return {y: res[:, y_headers.index(y)] for y in targets}
 
     def get_data_format(self):
         return self.model.metadata["data_format_version"]
@@ -1,34 +1,255 @@
+# Standard
+from typing import Optional
+import os
+
 # Third Party
+import numpy
 import pandas
 
 # Local
-from ...data import lookup_format_version
+from ...data import get_format_by_version, lookup_format_version
+from ...data.manager import ARROW_EXTENSIONS, PARQUET_EXTENSIONS, formats
+from ...utils import timed
+
+# numeric columns that lookups interpolate over, all other columns have to match
+INTERPOLATION_KEYS = ["number_gpus", "batch_size", "seq_len"]
+
+
+def _get_format_columns(column_names: list) -> Optional[list]:
+    # the columns of the largest data format all of whose columns are in the file
+    columns = [
+        f.get_all_columns()
+        for f in formats
+        if set(f.get_all_columns()) <= set(column_names)
+    ]
+    if columns:
+        return max(columns, key=len)
+    return None
+
+
+def read_lookup_data(data_path: str) -> pandas.DataFrame:
+    """read lookup data from a csv file, or an Arrow IPC or Parquet file
+
+    Arrow IPC files are memory mapped, so processes reading the same file share it
+    and numeric columns are not copied. Columnar files are read as far as the
+    columns of their data format go, eg, extra columns are left out, those of
+    Parquet files without being decoded. See `data.convert` to convert a csv file.
+    """
+    ext = os.path.splitext(data_path)[1]
+    if ext not in ARROW_EXTENSIONS + PARQUET_EXTENSIONS:
+        return pandas.read_csv(data_path)
+
+    # Third Party
+    import pyarrow
+    import pyarrow.parquet
+
+    if ext in ARROW_EXTENSIONS:
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(data_path)).read_all()
+        columns = _get_format_columns(table.column_names)
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        # the schema is read from the footer, so only the needed columns are decoded
+        schema = pyarrow.parquet.read_schema(data_path, memory_map=True)
+        columns = _get_format_columns(schema.names)
+        table = pyarrow.parquet.read_table(data_path, columns=columns, memory_map=True)
+
+    # split blocks keeps numeric columns as views of the mapped file
+    return table.to_pandas(split_blocks=True)
+
+
+def get_default_max_distance() -> float:
+    """return how far lookups interpolate from measured points, by default
+
+    The distance is on a log2 scale of the interpolation keys, so 1 reaches from a
+    query at seq len 3000 to measurements at 2048 and 4096, or to twice or half
+    the batch size, on each side of the query. Set the environment variable
+    `ESTIMATOR_LOOKUP_MAX_DISTANCE` to change it, or to 0 to only use exact matches.
+    """
+    return float(os.getenv("ESTIMATOR_LOOKUP_MAX_DISTANCE", "1"))
 
 
 class LookupRegressor:
-    def __init__(self, data_path=None):
+    def __init__(self, data_path=None, max_distance: Optional[float] = None):
         self.data = None
+        self._indexes = {}
+        self._grids = {}
+        self.max_distance = (
+            get_default_max_distance() if max_distance is None else max_distance
+        )
 
         if data_path is not None:
             self.load(data_path)
 
     def load(self, data_path):
-        self.data = pandas.read_csv(data_path)
+        self.data = read_lookup_data(data_path)
+        self._data_format = lookup_format_version(",".join(self.data.columns))
+        self._columns = {c: self.data[c].to_numpy() for c in self.data.columns}
+        # keys -> {values of the keys: positions of the matching rows}
+        self._indexes = {}
+        # (group keys, interpolation keys) -> {group: (key values, numeric columns)}
+        self._grids = {}
+
+        # queries formatted for the data format use all of its X columns
+        data_format = get_format_by_version(self._data_format)
+        if data_format is not None:
+            self._get_index(tuple(data_format.X.split(",")))
 
     def get_data_format(self):
-        keys = ",".join(list(self.data.columns.values))
-        return lookup_format_version(keys)
+        return self._data_format
+
+    def _get_index(self, keys: tuple) -> dict:
+        # the index of each combination of keys is built once, on first use
+        index = self._indexes.get(keys)
+        if index is None:
+            # rows with a missing key are left out, they never match
+            groups = self.data.groupby(list(keys), sort=False).indices
+            index = {k if isinstance(k, tuple) else (k,): v for k, v in groups.items()}
+            self._indexes[keys] = index
+        return index
 
+    def _find(self, X: dict):
+        # positions of the rows matching X on all of its keys
+        return self._get_index(tuple(X)).get(tuple(X.values()), [])
+
+    @timed("lookup")
     def run(self, X: dict):
-        query = ""
-        for key, val in X.items():
-            if isinstance(val, str):
-                query += f' and {key} == "{val}"'
-            else:
-                query += f" and {key} == {val}"
-        query = query[5:]
-
-        res = self.data.query(query)
+        """Lookup all entries matching X on all of its keys.
+
+        Returns a dataframe of the matching entries, without the columns of X.
+        """
+        res = self.data.iloc[self._find(X)]
         res = res.drop(columns=X.keys())
 
         return res
+
+    @timed("lookup")
+    def lookup(self, X: dict) -> Optional[dict]:
+        """Lookup the first entry matching X on all of its keys.
+
+        Returns:
+            Optional[dict]: the other columns of the entry, or None if nothing matched.
+        """
+        rows = self._find(X)
+        if len(rows) == 0:
+            return None
+
+        return {
+            c: v[rows[0]].item() if hasattr(v[rows[0]], "item") else v[rows[0]]
+            for c, v in self._columns.items()
+            if c not in X
+        }
+
+    @timed("lookup")
+    def run_batch(self, X: pandas.DataFrame):
+        """Lookup every row of X, matching on all of its columns.
+
+        Returns a dataframe with one row per row of X, in the same order, holding
+        the first matching entry of the data, or NaNs where nothing matched.
+        """
+        keys = list(X.columns)
+        data = self.data.drop_duplicates(subset=keys, keep="first")
+
+        # a None key never matches anything, same as in run
+        matched = X.notnull().all(axis=1)
+        query = X[matched].infer_objects().reset_index(drop=True)
+
+        res = query.merge(data, on=keys, how="left").drop(columns=keys)
+        res.index = X.index[matched]
+
+        return res.reindex(X.index)
+
+    def _get_grid(self, group_keys, interp_keys):
+        # the grids of each combination of keys are built once, on first use
+        index = self._grids.get((group_keys, interp_keys))
+        if index is not None:
+            return index
+
+        data = self.data.dropna(subset=list(interp_keys))
+        data = data[(data[list(interp_keys)] > 0).all(axis=1)]
+        values = data.drop(columns=list(group_keys + interp_keys)).select_dtypes(
+            "number"
+        )
+
+        index = {}
+        groups = data.groupby(list(group_keys)) if group_keys else [((), data)]
+        for group, rows in groups:
+            index[group if isinstance(group, tuple) else (group,)] = (
+                rows[list(interp_keys)].to_numpy(dtype=float),
+                {c: values.loc[rows.index, c].to_numpy(dtype=float) for c in values},
+            )
+
+        self._grids[(group_keys, interp_keys)] = index
+        return index
+
+    def _interpolate_grid(self, points, vals, point) -> Optional[float]:
+        # multilinear interpolation, one key at a time, between the measurements
+        # bracketing the point on that key
+        if len(point) == 0:
+            return float(vals[0]) if len(vals) > 0 else None
+
+        keys, q = points[:, 0], point[0]
+        if (keys == q).any():
+            # measured at this value, nothing to interpolate on this key
+            at = keys == q
+            return self._interpolate_grid(points[at, 1:], vals[at], point[1:])
+
+        below, above = keys[keys < q], keys[keys > q]
+        if len(below) == 0 or len(above) == 0:
+            # never extrapolate
+            return None
+        lo, hi = below.max(), above.min()
+        if max(numpy.log2(q / lo), numpy.log2(hi / q)) > self.max_distance:
+            return None
+
+        res_lo = self._interpolate_grid(
+            points[keys == lo, 1:], vals[keys == lo], point[1:]
+        )
+        res_hi = self._interpolate_grid(
+            points[keys == hi, 1:], vals[keys == hi], point[1:]
+        )
+        if res_lo is None or res_hi is None:
+            return None
+
+        return res_lo + (q - lo) / (hi - lo) * (res_hi - res_lo)
+
+    @timed("lookup")
+    def interpolate(self, X: dict, target: str) -> Optional[float]:
+        """Interpolate the target between the measurements around X.
+
+        Entries have to match X on all keys except the interpolation keys, the
+        number of gpus, batch size and seq len. On each of those where X was not
+        measured, X has to lie between two measured values, each within max_distance
+        of it on a log2 scale, and the target is interpolated linearly between them.
+        Values outside of the measurements are never extrapolated.
+
+        Returns:
+            Optional[float]: the interpolated target, or None if X is not surrounded
+                by measurements.
+        """
+        if self.max_distance <= 0:
+            return None
+
+        interp_keys = tuple(
+            k for k in INTERPOLATION_KEYS if k in X and k in self.data.columns
+        )
+        group_keys = tuple(k for k in X if k not in interp_keys)
+        point = [X[k] for k in interp_keys]
+        if not interp_keys or any(v is None or v <= 0 for v in point):
+            return None
+        if not set(group_keys) <= set(self.data.columns):
+            return None
+
+        entry = self._get_grid(group_keys, interp_keys).get(
+            tuple(X[k] for k in group_keys)
+        )
+        if entry is None or target not in entry[1]:
+            return None
+        points, values = entry
+
+        measured = ~numpy.isnan(values[target])
+        return self._interpolate_grid(
+            points[measured],
+            values[target][measured],
+            numpy.asarray(point, dtype=float),
+        )
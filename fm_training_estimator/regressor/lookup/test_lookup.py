@@ -1,11 +1,16 @@
 # Standard
 from pathlib import Path
 
+# Third Party
+import pandas
+
 # Local
+from ...data.convert import convert
 from .lookup import LookupRegressor
 
 test_data1 = (Path(__file__).parent / "../test_data/data1.csv").as_posix()
 test_data2 = (Path(__file__).parent / "../test_data/data2.csv").as_posix()
+test_data3 = (Path(__file__).parent / "../test_data/data3.csv").as_posix()
 
 
 def test_lookup():
@@ -63,3 +68,117 @@ def test_lookup():
 
     assert res.shape[0] == 1
     assert res[0:1]["tokens_per_second"].item() == 1000
+
+
+def test_lookup_first_match():
+    reg = LookupRegressor(test_data1)
+    query = {
+        "model_name": "mercury-12b",
+        "gpu_model": "X100",
+        "number_gpus": 2,
+        "batch_size": 8,
+        "seq_len": 1024,
+    }
+    assert reg.lookup(query) == {"tokens_per_second": 2000}
+    assert reg.lookup({**query, "seq_len": 3}) is None
+    assert reg.lookup({**query, "seq_len": None}) is None
+
+    # queries on some of the keys
+    assert reg.lookup({"model_name": "pluto-13b"}) == {
+        "gpu_model": "X100",
+        "number_gpus": 2,
+        "batch_size": 4,
+        "seq_len": 512,
+        "tokens_per_second": 500,
+    }
+
+    reg = LookupRegressor(test_data2)
+    assert reg.get_data_format() == "v1"
+    res = reg.lookup(
+        {
+            "model_name": "ibm-granite/granite-7b-base",
+            "number_gpus": 2,
+            "batch_size": 4,
+            "seq_len": 1024,
+        }
+    )
+    assert res == {"tokens_per_second": 1000, "memory": 20, "memory_act": 10}
+
+
+def test_lookup_batch():
+    reg = LookupRegressor(test_data2)
+
+    query = pandas.DataFrame(
+        {
+            "model_name": ["ibm-granite/granite-7b-base"] * 3,
+            "number_gpus": [2, 2, 2],
+            "batch_size": [4, 4, 4],
+            "seq_len": [1024, 3, 512],
+        }
+    )
+    res = reg.run_batch(query)
+
+    # results are in query order, with NaN for no match
+    assert res.shape[0] == 3
+    assert res["tokens_per_second"][0] == 1000
+    assert pandas.isna(res["tokens_per_second"][1])
+    assert res["tokens_per_second"][2] == 500
+
+
+def test_interpolate():
+    reg = LookupRegressor(test_data1)
+    query = {
+        "model_name": "mercury-12b",
+        "gpu_model": "X100",
+        "number_gpus": 2,
+        "batch_size": 4,
+        "seq_len": 768,
+    }
+
+    # linear between the measurements at 512 and 1024
+    assert reg.interpolate(query, "tokens_per_second") == 750
+
+    # and between batch sizes 4 and 8 too
+    assert reg.interpolate({**query, "batch_size": 6}, "tokens_per_second") == 1125
+
+    # exact matches are returned as they are
+    assert reg.interpolate({**query, "seq_len": 1024}, "tokens_per_second") == 1000
+
+    # the other keys have to match
+    assert reg.interpolate({**query, "gpu_model": "X200"}, "tokens_per_second") is None
+    assert reg.interpolate({**query, "seq_len": 1024}, "memory") is None
+
+    # nothing is extrapolated beyond the measurements on any key
+    assert reg.interpolate({**query, "seq_len": 8192}, "tokens_per_second") is None
+    assert reg.interpolate({**query, "batch_size": 16}, "tokens_per_second") is None
+    assert reg.interpolate({**query, "number_gpus": 3}, "tokens_per_second") is None
+
+    # both measurements have to be within max_distance, 4096 is 2 away from 1024
+    query = {**query, "model_name": "pluto-13b", "seq_len": 1024}
+    assert reg.interpolate(query, "tokens_per_second") is None
+    reg.max_distance = 2
+    assert reg.interpolate(query, "tokens_per_second") == 1000
+
+    reg.max_distance = 0
+    assert reg.interpolate(query, "tokens_per_second") is None
+
+
+def test_columnar(tmp_path):
+    csv = LookupRegressor(test_data3)
+
+    for name in ["data.arrow", "data.parquet"]:
+        path = (tmp_path / name).as_posix()
+        convert(test_data3, path)
+
+        reg = LookupRegressor(path)
+        assert reg.get_data_format() == csv.get_data_format() == "v2"
+        pandas.testing.assert_frame_equal(reg.data, csv.data)
+
+    # columns of no data format are left out
+    data = csv.data.assign(notes="measured on node 3")
+    data.to_feather(tmp_path / "extra.arrow", compression="uncompressed")
+    data.to_parquet(tmp_path / "extra.parquet")
+    for name in ["extra.arrow", "extra.parquet"]:
+        reg = LookupRegressor((tmp_path / name).as_posix())
+        assert reg.get_data_format() == "v2"
+        assert "notes" not in reg.data
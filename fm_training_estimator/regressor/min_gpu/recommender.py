@@ -1,4 +1,5 @@
 import logging
+import numpy
 from orchestrator.schema.point import SpacePoint
 from orchestrator.schema.reference import (
     ExperimentReference,
@@ -10,6 +11,9 @@ from autoconf.min_gpu_recommender import (
 )
 from autoconf.utils import config_mapper
 
+from ...utils import timed
+from ..cache import PredictionCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +31,7 @@ class MinGpuRecommenderCaller(object):
                     experimentIdentifier="min_gpu_recommender",
                 )
             )
+        self._predictions = PredictionCache()
 
     @property
     def experiment(self)->ExperimentReference:
@@ -40,6 +45,15 @@ class MinGpuRecommenderCaller(object):
     #def normalize_config_dict(self, X:dict) -> dict:
 
     def run(self, X: dict, y: str) -> dict:
+        # the recommendation is all the targets, workers and gpus per worker
+        return self.run_all(X)
+
+    @timed("regressor")
+    def run_all(self, X: dict) -> dict:
+        """recommend for one config, returning a dict of target name to result"""
+        return self._predictions.get(X, lambda: self._recommend(X))
+
+    def _recommend(self, X: dict) -> dict:
 
         #X = normalize_config_dict(X)
         logger.debug(f'Received input {X} for recommendation')
@@ -76,3 +90,10 @@ class MinGpuRecommenderCaller(object):
             logger.info("Goodbye")
 
         return result
+
+    @timed("regressor")
+    def run_batch(self, rows, targets) -> dict:
+        """recommend for many configs, returning a dict of target name to array of results"""
+        # the recommender api takes one config per call, so there is nothing to batch
+        results = [self._recommend(X) for X in rows]
+        return {y: numpy.array([r[y] for r in results]) for y in targets}
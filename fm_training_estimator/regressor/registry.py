@@ -0,0 +1,67 @@
+# Standard
+import os
+import threading
+
+# Local
+from ..utils import fingerprint, span
+from .dispatch import GetRegressor
+from .lookup import LookupRegressor
+
+# (kind, absolute path) -> (fingerprint, handle)
+_handles = {}
+_handles_lock = threading.Lock()
+
+
+def _get_handle(kind: str, path: str, loader, stage: str):
+    key = (kind, os.path.abspath(path))
+    fp = fingerprint(path)
+
+    with _handles_lock:
+        entry = _handles.get(key)
+        if entry is not None and entry[0] == fp:
+            return entry[1]
+
+    # loading is done outside the lock, a concurrent miss at worst loads twice
+    with span(stage):
+        handle = loader(path)
+
+    with _handles_lock:
+        _handles[key] = (fp, handle)
+
+    return handle
+
+
+def get_shared_lookup_regressor(data_path: str) -> LookupRegressor:
+    """return the lookup regressor for the data file, loading it at most once per process
+
+    The data is loaded again only when the file changes on disk. The returned
+    regressor is shared and must not be modified, eg, by calling load on it.
+
+    Args:
+        data_path (str): path to the lookup data csv
+
+    Returns:
+        LookupRegressor: the shared lookup regressor
+    """
+    return _get_handle("lookup", data_path, LookupRegressor, "lookup_load")
+
+
+def get_shared_regressor(model_path: str):
+    """return the regressor for the model file, loading it at most once per process
+
+    The model is loaded again only when the file changes on disk. The returned
+    regressor is shared and must not be modified, eg, by training or loading it.
+
+    Args:
+        model_path (str): path to the model zip
+
+    Returns:
+        the shared regressor, of the type stored in the model zip
+    """
+    return _get_handle("model", model_path, GetRegressor, "regressor_load")
+
+
+def clear_shared_regressors():
+    """drop all loaded lookup regressors and regressors"""
+    with _handles_lock:
+        _handles.clear()
@@ -0,0 +1,84 @@
+# Standard
+from pathlib import Path
+import io
+import zipfile
+
+# Third Party
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+import joblib
+import pandas
+import pytest
+
+pytest.importorskip("arise_predictions")
+
+# Local
+from .arise import AriseRegressor
+
+test_data2 = (Path(__file__).parent / "test_data/data2.csv").as_posix()
+
+
+def drop_model_name(X):
+    return X.drop(columns=["model_name"])
+
+
+def make_arise_zip(model_path, targets):
+    # laid out as arise auto_build_models writes it, with pipelines like those of
+    # arise, fitted on the inputs in sorted order
+    data = pandas.read_csv(test_data2)
+    X = data[sorted(["model_name", "number_gpus", "batch_size", "seq_len"])]
+
+    rankings = []
+    with zipfile.ZipFile(model_path, "w") as model_zip:
+        for y in targets:
+            if y == "memory":
+                # arise selects the categorical columns by position
+                pre = ColumnTransformer(
+                    [("cat", OneHotEncoder(), [X.columns.get_loc("model_name")])],
+                    remainder="passthrough",
+                )
+            else:
+                # checks the names and order of the columns, as fitted
+                pre = FunctionTransformer(drop_model_name)
+            est = Pipeline([("preprocessor", pre), ("estimator", LinearRegression())])
+            est.fit(X, data[y])
+
+            buf = io.BytesIO()
+            joblib.dump(est, buf)
+            model_zip.writestr(f"estimator-linear-LR-{y}.pkl", buf.getvalue())
+            rankings.append(
+                {
+                    "estimator": "LR",
+                    "linear": True,
+                    "target_variable": y,
+                    "rank_MAPE": 1,
+                }
+            )
+
+        model_zip.writestr(
+            "all-star-rankings.csv", pandas.DataFrame(rankings).to_csv(index=False)
+        )
+        model_zip.writestr("estimator_data_version", "v1")
+        model_zip.writestr("model_type", "arise")
+
+    return data
+
+
+def test_arise(tmp_path):
+    model_path = tmp_path / "arise.zip"
+    data = make_arise_zip(model_path, ["memory", "tokens_per_second"])
+
+    reg = AriseRegressor(model_path)
+    assert reg.get_data_format() == "v1"
+
+    # queries come in the order of the data format, not the sorted one of arise
+    rows = data[["model_name", "number_gpus", "batch_size", "seq_len"]].values.tolist()
+    assert reg.run(rows[0], "memory") == pytest.approx(data["memory"][0])
+    assert set(reg.run_all(rows[0])) == {"memory", "tokens_per_second"}
+
+    res = reg.run_batch(rows, ["tokens_per_second"])
+    assert res["tokens_per_second"][0] == pytest.approx(
+        reg.run(rows[0], "tokens_per_second")
+    )
@@ -0,0 +1,47 @@
+# Local
+from .cache import PredictionCache
+
+
+def test_prediction_cache():
+    calls = []
+
+    def predict(X):
+        calls.append(X)
+        return {"memory": X[0] * 2, "tokens_per_second": X[0] * 3}
+
+    cache = PredictionCache(maxsize=2)
+
+    # every target of a query from one prediction
+    assert cache.get(["a", 1], lambda: predict([1]))["memory"] == 2
+    assert cache.get(["a", 1], lambda: predict([1]))["tokens_per_second"] == 3
+    assert len(calls) == 1
+
+    # returned dicts are copies
+    cache.get(["a", 1], lambda: predict([1]))["memory"] = 0
+    assert cache.get(["a", 1], lambda: predict([1]))["memory"] == 2
+
+    # least recently used queries are dropped
+    cache.get(["a", 2], lambda: predict([2]))
+    cache.get(["a", 3], lambda: predict([3]))
+    cache.get(["a", 1], lambda: predict([1]))
+    assert len(calls) == 4
+
+    # dict queries, of the min gpu recommender, are cached too
+    cache.get({"model_name": "a"}, lambda: predict([4]))
+    cache.get({"model_name": "a"}, lambda: predict([4]))
+    assert len(calls) == 5
+
+    # unhashable queries are predicted every time
+    cache.get([["a"], 1], lambda: predict([5]))
+    cache.get([["a"], 1], lambda: predict([5]))
+    assert len(calls) == 7
+
+
+def test_prediction_cache_disabled(monkeypatch):
+    monkeypatch.setenv("ESTIMATOR_PREDICTION_CACHE_SIZE", "0")
+    calls = []
+
+    cache = PredictionCache()
+    cache.get([1], lambda: calls.append(1) or {"memory": 1})
+    cache.get([1], lambda: calls.append(1) or {"memory": 1})
+    assert len(calls) == 2
@@ -0,0 +1,26 @@
+# Standard
+from pathlib import Path
+import shutil
+
+# Local
+from .registry import get_shared_lookup_regressor
+
+test_data1 = (Path(__file__).parent / "test_data/data1.csv").as_posix()
+test_data2 = (Path(__file__).parent / "test_data/data2.csv").as_posix()
+
+
+def test_shared_lookup_regressor(tmp_path):
+    data_path = tmp_path / "data.csv"
+    shutil.copy(test_data1, data_path)
+
+    reg = get_shared_lookup_regressor(data_path.as_posix())
+    assert "gpu_model" in reg.data.columns
+
+    # the same handle is returned while the file is unchanged
+    assert get_shared_lookup_regressor(data_path.as_posix()) is reg
+
+    # the data is loaded again once the file changes
+    shutil.copy(test_data2, data_path)
+    reg2 = get_shared_lookup_regressor(data_path.as_posix())
+    assert reg2 is not reg
+    assert "gpu_model" not in reg2.data.columns
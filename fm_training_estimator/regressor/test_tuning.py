@@ -0,0 +1,47 @@
+# Third Party
+from sklearn.ensemble import RandomForestRegressor
+import numpy
+import pandas
+
+# Local
+from .tuning import model_cost, tune
+
+
+def test_model_cost():
+    assert model_cost({"n_estimators": 100, "max_depth": 3}) < model_cost(
+        {"n_estimators": 100, "max_depth": 7}
+    )
+    assert model_cost({"n_estimators": 100, "max_depth": 3}) < model_cost(
+        {"n_estimators": 400, "max_depth": 3}
+    )
+    assert model_cost({"n_estimators": 10, "max_depth": None}) > model_cost(
+        {"n_estimators": 10, "max_depth": 32}
+    )
+
+
+def test_tune():
+    rng = numpy.random.default_rng(0)
+    X = pandas.DataFrame({"a": rng.uniform(1, 2, 40), "b": rng.uniform(1, 2, 40)})
+    Y = pandas.DataFrame({"y1": X["a"] * 10, "y2": numpy.full(40, 5.0)})
+
+    grid = {"n_estimators": [5, 20], "max_depth": [2, None]}
+    res = tune(RandomForestRegressor(random_state=0), grid, X, Y, folds=4, n_jobs=1)
+
+    assert res["params"] in [
+        dict(zip(grid, v)) for v in [(5, 2), (5, None), (20, 2), (20, None)]
+    ]
+    assert set(res["mape"]) == {"y1", "y2"}
+    assert res["mape"]["y2"] == 0
+    assert 0 < res["mape"]["y1"] < 0.2
+
+
+def test_tune_prefers_smaller_models():
+    # a constant target, every model is exact, so the cheapest one is picked
+    X = pandas.DataFrame({"a": numpy.arange(20.0)})
+    Y = pandas.DataFrame({"y": numpy.full(20, 3.0)})
+
+    grid = {"n_estimators": [50, 5, 20], "max_depth": [None, 4, 2]}
+    res = tune(RandomForestRegressor(random_state=0), grid, X, Y, folds=3, n_jobs=1)
+
+    assert res["params"] == {"n_estimators": 5, "max_depth": 2}
+    assert res["cost"] == model_cost(res["params"])
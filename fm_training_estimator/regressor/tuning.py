@@ -0,0 +1,107 @@
+# Standard
+from typing import Optional
+import math
+
+# Third Party
+from sklearn.base import clone
+from sklearn.metrics import make_scorer, mean_absolute_percentage_error
+from sklearn.model_selection import GridSearchCV, KFold
+import numpy
+import pandas
+
+
+def model_cost(params: dict) -> float:
+    """return the relative cost of running a tree ensemble with the given params
+
+    Inference walks every tree to a leaf, and the size of a tree grows with its
+    depth, so the cost is the number of trees times 2 to the depth. An unlimited
+    depth counts as deeper than any limit.
+    """
+    depth = params.get("max_depth") or 64
+    return params.get("n_estimators", 1) * 2.0**depth
+
+
+def _target_mape(i: Optional[int]):
+    # error of one target column, or of all of them when i is None
+    def score(y_true, y_pred):
+        y_true = numpy.asarray(y_true).reshape(len(y_true), -1)
+        y_pred = numpy.asarray(y_pred).reshape(len(y_pred), -1)
+        if i is None:
+            return mean_absolute_percentage_error(y_true, y_pred)
+        return mean_absolute_percentage_error(y_true[:, i], y_pred[:, i])
+
+    return make_scorer(score, greater_is_better=False)
+
+
+def _pick_smallest(folds: int):
+    # one standard error rule: of the candidates as accurate as the best within the
+    # noise of cross validation, refit the cheapest one
+    def pick(cv_results):
+        mean = cv_results["mean_test_mape"]
+        best = numpy.argmax(mean)
+        threshold = mean[best] - cv_results["std_test_mape"][best] / math.sqrt(folds)
+
+        candidates = numpy.flatnonzero(mean >= threshold)
+        costs = [model_cost(cv_results["params"][i]) for i in candidates]
+        # equal costs go to the more accurate
+        return min(zip(costs, -mean[candidates], candidates))[2]
+
+    return pick
+
+
+def tune(
+    model,
+    param_grid: dict,
+    X: pandas.DataFrame,
+    Y: pandas.DataFrame,
+    folds: int = 5,
+    n_jobs: int = -1,
+) -> dict:
+    """search the param grid with k-fold cross validation, in parallel
+
+    Every candidate is scored by its mean absolute percentage error on the held out
+    folds, averaged over the targets. The cheapest candidate whose error is within
+    one standard error of the best is picked, see `model_cost`.
+
+    Args:
+        model: the sklearn compatible estimator to tune, not modified
+        param_grid (dict): param name -> list of values to try
+        X (pandas.DataFrame): the encoded inputs
+        Y (pandas.DataFrame): the targets
+        folds (int): number of folds, at most the number of rows
+        n_jobs (int): number of candidates fitted at once, -1 for all cores
+
+    Returns:
+        dict: the picked "params", its "cost" and its held out error, "mape", per
+            target
+    """
+    folds = min(folds, len(X))
+    targets = list(Y.columns)
+
+    scoring = {"mape": _target_mape(None)}
+    for i, y in enumerate(targets):
+        scoring[f"mape_{y}"] = _target_mape(i)
+
+    # candidates are fitted in parallel, so each of them gets a single thread
+    model = clone(model)
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=1)
+
+    search = GridSearchCV(
+        model,
+        param_grid,
+        scoring=scoring,
+        refit=_pick_smallest(folds),
+        cv=KFold(n_splits=folds, shuffle=True, random_state=0),
+        n_jobs=n_jobs,
+    )
+    search.fit(X, Y)
+
+    best = search.best_index_
+    return {
+        "params": search.cv_results_["params"][best],
+        "cost": model_cost(search.cv_results_["params"][best]),
+        "mape": {
+            y: abs(search.cv_results_[f"mean_test_mape_{y}"][best]) for y in targets
+        },
+    }
@@ -1,7 +1,11 @@
 # Standard
 from pathlib import Path
 
+# Third Party
+import pytest
+
 # Local
+from ..dispatch import GetRegressor
 from .xgboost import XGBoostRegressor
 
 test_data1 = (Path(__file__).parent / "../test_data/data1.csv").as_posix()
@@ -38,3 +42,89 @@ def test_reg_multi(tmp_path):
 
     assert len(out) == 1
     assert len(out[0]) == 3
+
+
+def test_reg_batch(tmp_path):
+    model_path = tmp_path / "test3.model.json"
+
+    reg = XGBoostRegressor()
+    reg.train(test_data2, model_path, ["tokens_per_second", "memory", "memory_act"])
+
+    rows = [
+        ["ibm-granite/granite-7b-base", 2, 4, 512],
+        ["ibm-granite/granite-7b-base", 2, 4, 1024],
+    ]
+    res = reg.run_batch(rows, ["tokens_per_second", "memory"])
+
+    # same predictions as one row at a time
+    assert len(res["tokens_per_second"]) == 2
+    for i, row in enumerate(rows):
+        assert res["tokens_per_second"][i] == reg.run(row, "tokens_per_second")
+        assert res["memory"][i] == reg.run(row, "memory")
+
+
+def test_reg_batch_categories(tmp_path):
+    data_path = tmp_path / "data.csv"
+    model_path = tmp_path / "test4.model.json"
+
+    # two models far apart, so the category matters
+    lines = [
+        "model_name,number_gpus,batch_size,seq_len,tokens_per_second,memory,memory_act"
+    ]
+    for name, tps in [("mercury-12b", 1000), ("pluto-13b", 9000)]:
+        for bs in [4, 8, 16]:
+            for sl in [512, 1024, 2048]:
+                lines.append(f"{name},2,{bs},{sl},{tps},20,10")
+    data_path.write_text("\n".join(lines))
+
+    reg = XGBoostRegressor()
+    reg.train(data_path, model_path, ["tokens_per_second", "memory", "memory_act"])
+
+    # the same category gets the same prediction, whatever else is in the batch
+    rows = [["pluto-13b", 2, 4, 1024], ["mercury-12b", 2, 4, 1024]]
+    res = reg.run_batch(rows, ["tokens_per_second"])["tokens_per_second"]
+    assert res[0] == reg.run(rows[0], "tokens_per_second")
+    assert res[1] == reg.run(rows[1], "tokens_per_second")
+    assert res[0] > res[1]
+
+    # same on a loaded model, and an unknown category is an error, as in the encoder
+    reg1 = XGBoostRegressor(model_path)
+    assert reg1.run(rows[0], "tokens_per_second") == res[0]
+    with pytest.raises(ValueError):
+        reg1.run(["venus-7b", 2, 4, 1024], "tokens_per_second")
+
+
+def test_reg_dispatch(tmp_path):
+    model_path = tmp_path / "test5.model.json"
+
+    reg = XGBoostRegressor()
+    reg.train(test_data2, model_path, ["tokens_per_second", "memory", "memory_act"])
+
+    # loaded from the zip members, without extracting them
+    reg1 = GetRegressor(model_path)
+    assert isinstance(reg1, XGBoostRegressor)
+
+    row = ["ibm-granite/granite-7b-base", 2, 4, 1024]
+    assert reg1.run(row, "memory") == reg.run(row, "memory")
+
+
+def test_reg_run_all(tmp_path):
+    model_path = tmp_path / "test6.model.json"
+
+    reg = XGBoostRegressor()
+    reg.train(test_data2, model_path, ["tokens_per_second", "memory", "memory_act"])
+
+    row = ["ibm-granite/granite-7b-base", 2, 4, 1024]
+    res = reg.run_all(row)
+    assert set(res) == {"tokens_per_second", "memory", "memory_act"}
+    assert res["memory"] == reg.run_batch([row], ["memory"])["memory"][0]
+
+    # the model is run once for all targets of a query
+    calls = []
+    predict_row = reg._predict_row
+    reg._predict_row = lambda X: calls.append(X) or predict_row(X)
+    row = ["ibm-granite/granite-7b-base", 2, 8, 1024]
+    reg.run(row, "memory")
+    reg.run(row, "tokens_per_second")
+    reg.run_all(row)
+    assert len(calls) == 1
@@ -5,13 +5,24 @@ import fire
 from .xgboost import XGBoostRegressor
 
 
-def train(data_path: str, model_path: str, y_headers: list[str]):
+def train(
+    data_path: str,
+    model_path: str,
+    y_headers: list[str],
+    tune: bool = False,
+    folds: int = 5,
+    n_jobs: int = -1,
+):
     """Train a XGBoostRegressor model that can be used by this estimator library.
 
     Args:
         data_path (str): the path to training data
         model_path (str): the output path of trained model. Must end with .zip.
         y_headers (list[str]): list of column names to drop from data
+        tune (bool): search the params of the model with k-fold cross validation
+            first, picking the smallest model of about the best accuracy
+        folds (int): number of cross validation folds, when tuning
+        n_jobs (int): number of parallel fits when tuning, -1 for all cores
 
     """
     model = XGBoostRegressor()
@@ -21,6 +32,13 @@ def train(data_path: str, model_path: str, y_headers: list[str]):
         print("Refusing to continue!!")
         return
 
+    if tune:
+        print("Tuning model...")
+        res = model.tune(data_path, y_headers, folds=folds, n_jobs=n_jobs)
+        print("...picked params: ", res["params"])
+        for y, mape in res["mape"].items():
+            print(f"   held out error of {y}: {mape:.2%} MAPE")
+
     print("Training model...")
     model.train(data_path, model_path, y_headers)
     print("...successfully wrote model to file: ", model_path)
@@ -1,18 +1,29 @@
-import os
+import io
 import zipfile
 import tempfile
 
 # Third Party
 from xgboost import XGBRegressor
+import numpy
 import pandas
 from sklearn.preprocessing import OrdinalEncoder
 import joblib
 
 # Local
 from ...data import lookup_format_version, get_format_by_version
+from ...utils import timed
+from .. import tuning
+from ..cache import PredictionCache
 
 
 class XGBoostRegressor:
+    # searched by tune, around the defaults
+    PARAM_GRID = {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [3, 5, 7],
+        "eta": [0.05, 0.1, 0.3],
+    }
+
     def __init__(self, model_path=None):
         self.model = XGBRegressor(
             n_estimators=400,
@@ -23,28 +34,42 @@ class XGBoostRegressor:
             enable_categorical=True,
         )
         self.cat_enc = OrdinalEncoder()
+        self._predictions = PredictionCache()
 
         if model_path is not None:
             self.load(model_path)
 
 
     def load(self, model_path):
-        with tempfile.TemporaryDirectory() as mdir:
+        # model_path is the path of the model zip, or the zip itself, already open
+        if not isinstance(model_path, zipfile.ZipFile):
             with zipfile.ZipFile(model_path) as model_zip:
-                model_zip.extractall(mdir)
+                return self.load(model_zip)
 
-            path_m = os.path.join(mdir, "model.json")
-            self.model.load_model(path_m)
+        # read the members straight from the zip, nothing is extracted
+        self.model.load_model(bytearray(model_path.read("model.json")))
+        self.cat_enc = joblib.load(io.BytesIO(model_path.read("cat_enc.json")))
 
-            path_e = os.path.join(mdir, "cat_enc.json")
-            self.cat_enc = joblib.load(path_e)
+        self._prepare()
 
-    def train(self, data_path: str, model_path: str, y_headers: list[str]):
-        data = pandas.read_csv(data_path)
+    def _prepare(self):
+        # what run needs of the model and encoder, derived once
+        self._booster = self.model.get_booster()
+        feature_names = self._booster.feature_names
 
-        # obtain the data format metadata
-        data_keys = ",".join(list(data.columns.values))
+        # column index -> {category: code}, the same codes as the encoder gives
+        self._cat_codes = {
+            feature_names.index(cf): {c: float(i) for i, c in enumerate(cats)}
+            for cf, cats in zip(self.cat_enc.feature_names_in_, self.cat_enc.categories_)
+        }
+
+        data_format = get_format_by_version(self.get_data_format())
+        self._y_headers = data_format.Y.split(",") if data_format is not None else None
 
+        # predictions of the model before
+        self._predictions.clear()
+
+    def _encode_training_data(self, data, y_headers):
         # ordinal encode all "object" type columns, which are actually categories
         cat_feats = data.dtypes[data.dtypes=='object'].index.values.tolist()
         data[cat_feats] = self.cat_enc.fit_transform(data[cat_feats])
@@ -53,8 +78,26 @@ class XGBoostRegressor:
         for cf in cat_feats:
             data[cat_feats] = data[cat_feats].astype("category")
 
-        X = data.drop(columns=y_headers)
-        Y = data[y_headers]
+        return data.drop(columns=y_headers), data[y_headers]
+
+    def tune(self, data_path: str, y_headers: list[str], folds: int = 5, n_jobs: int = -1):
+        """search the params of the model with cross validation, see `regressor.tuning.tune`
+
+        The picked params are set on the model, for the next train.
+        """
+        X, Y = self._encode_training_data(pandas.read_csv(data_path), y_headers)
+
+        res = tuning.tune(self.model, self.PARAM_GRID, X, Y, folds=folds, n_jobs=n_jobs)
+        self.model.set_params(**res["params"])
+        return res
+
+    def train(self, data_path: str, model_path: str, y_headers: list[str]):
+        data = pandas.read_csv(data_path)
+
+        # obtain the data format metadata
+        data_keys = ",".join(list(data.columns.values))
+
+        X, Y = self._encode_training_data(data, y_headers)
 
         self.model.fit(X, Y)
 
@@ -84,24 +127,55 @@ class XGBoostRegressor:
             model_zip.write(buf_e.name, 'cat_enc.json')
             model_zip.write(buf_mt.name, 'model_type')
 
+        self._prepare()
+
 
     def run(self, X, y):
-        # convert input data array into form suitable to feed in
+        return self.run_all(X)[y]
 
-        # add column names
-        data = pandas.DataFrame([X], columns=self.model.get_booster().feature_names)
+    @timed("regressor")
+    def run_all(self, X):
+        """predict all targets of one row, returning a dict of target name to prediction"""
+        return self._predictions.get(
+            X, lambda: dict(zip(self._y_headers, self._predict_row(X)))
+        )
 
-        # encode category columns
-        cat_feats = data.dtypes[data.dtypes=='object'].index.values.tolist()
+    def _predict_row(self, X):
+        # a single row skips pandas and the encoder: encode the categories with the
+        # precomputed codes and predict on the numpy row in place
+        row = numpy.empty((1, len(X)))
+        for i, v in enumerate(X):
+            codes = self._cat_codes.get(i)
+            if codes is None:
+                row[0, i] = numpy.nan if v is None else v
+            elif v in codes:
+                row[0, i] = codes[v]
+            else:
+                raise ValueError(f"Found unknown category {v} in column {i}")
+
+        return self._booster.inplace_predict(row).reshape(-1)
+
+    @timed("regressor")
+    def run_batch(self, rows, targets):
+        """predict many rows in one call, returning a dict of target name to array of predictions"""
+        return self._predict(rows, targets)
+
+    def _predict(self, rows, targets):
+        data = pandas.DataFrame(list(rows), columns=self.model.get_booster().feature_names)
+
+        # encode category columns, all rows at once
+        cat_feats = list(self.cat_enc.feature_names_in_)
         data[cat_feats] = self.cat_enc.transform(data[cat_feats])
 
-        # now mark these as categorical feats
-        for cf in cat_feats:
-            data[cat_feats] = data[cat_feats].astype("category")
+        # mark them as categorical, with all the categories seen in training, so that
+        # the category codes are the same as in training for any subset of them
+        for cf, cats in zip(cat_feats, self.cat_enc.categories_):
+            dtype = pandas.CategoricalDtype(numpy.arange(len(cats), dtype=float))
+            data[cf] = data[cf].astype(dtype)
 
-        res = self.model.predict(data)
-        col_idx = get_format_by_version(self.get_data_format()).Y.split(",").index(y)
-        return res[0][col_idx]
+        res = self.model.predict(data).reshape(len(data), -1)
+        y_headers = get_format_by_version(self.get_data_format()).Y.split(",")
+        return {y: res[:, y_headers.index(y)] for y in targets}
 
     def get_data_format(self):
         return self.model.get_booster().attr("data_format_version")
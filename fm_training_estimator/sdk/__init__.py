@@ -1,2 +1,11 @@
 # Local
-from .sdk import estimate_cost, estimate_memory, estimate_time, estimate_tokens
+from .sdk import (
+    estimate,
+    estimate_batch,
+    estimate_cost,
+    estimate_memory,
+    estimate_time,
+    estimate_tokens,
+)
+from .search import search
+from .sweep import sweep
@@ -1,6 +1,16 @@
+# Standard
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import List, Tuple, Union
+import copy
+import threading
+
 # First Party
 from fm_training_estimator.config.arguments import (
+    BatchEstimateResult,
     CostEstimate,
+    DataArguments,
+    Estimate,
     EstimateInput,
     JobConfig,
     MemoryEstimate,
@@ -10,26 +20,126 @@ from fm_training_estimator.config.arguments import (
 from fm_training_estimator.memory.hybrid.hybrid import HybridEstimator
 from fm_training_estimator.memory.lora.hybrid import HybridLoraEstimator
 from fm_training_estimator.memory.qlora.hybrid import HybridQLoraEstimator
+from fm_training_estimator.regressor import (
+    get_shared_lookup_regressor,
+    get_shared_regressor,
+)
 from fm_training_estimator.throughput.hybrid.hybrid import HybridSpeedEstimator
 from fm_training_estimator.time import get_total_time
-from fm_training_estimator.tokens.te0.te0 import TokenEstimator0
 
 # Local
 from ..config import is_fsdp
-from ..utils import fmt_size, logger
+from ..utils import (
+    collect_timings,
+    fmt_size,
+    get_result_cache,
+    input_fingerprints,
+    logger,
+    make_cache_key,
+    span,
+    timed,
+)
+
+
+class _SharedResources:
+    """Estimator state that can be shared across job configs.
+
+    The lookup data and the regression model are loaded once, and a token estimator
+    is built once for every distinct dataset, no matter how many job configs use them.
+    """
+
+    def __init__(self, lookup_data_path: str = None, model_path: str = None):
+        self.lookup_data_path = lookup_data_path
+        self.model_path = model_path
+
+        self.lookup_est = None
+        if lookup_data_path is not None:
+            self.lookup_est = get_shared_lookup_regressor(lookup_data_path)
+
+        self.reg_est = None
+        if model_path is not None:
+            self.reg_est = get_shared_regressor(model_path)
+
+        self._token_ests = {}
+        self._lock = threading.Lock()
+
+    def get_token_estimator(self, da: DataArguments):
+        key = (
+            da.te_approach,
+            da.dataset,
+            da.dataset_text_field,
+            da.dataset_split,
+            da.dataset_config_name,
+            da.dataset_config_file,
+        )
+
+        with self._lock:
+            if key not in self._token_ests:
+                with span("token_estimator"):
+                    self._token_ests[key] = _get_token_estimator(da)
+
+            return self._token_ests[key]
 
+    def without_regressor(self):
+        """Return a view of these resources without the regression model, for theory estimates.
 
-def _get_hybrid_estimator(
-    conf: JobConfig, model_path: str = None, lookup_data_path: str = None
-):
+        The view shares the lookup data and the token estimators with this object.
+        """
+        resources = copy.copy(self)
+        resources.model_path = None
+        resources.reg_est = None
+        return resources
+
+    def without_lookup(self):
+        """Return a view of these resources without the lookup data.
+
+        The view shares the regression model and the token estimators with this object.
+        """
+        resources = copy.copy(self)
+        resources.lookup_data_path = None
+        resources.lookup_est = None
+        return resources
+
+
+def _get_token_estimator(da: DataArguments):
+    # token estimators load datasets, so they are only imported when used
+    if da.te_approach == 0:
+        # First Party
+        from fm_training_estimator.tokens.te0.te0 import TokenEstimator0
+
+        return TokenEstimator0(da)
+    if da.te_approach == 2:
+        # First Party
+        from fm_training_estimator.tokens.te2.te2 import TokenEstimator2
+
+        return TokenEstimator2(da)
+
+    return None
+
+
+def _get_lookup_data_path(estimate_input: EstimateInput):
+    lookup_data_path = None
+    if estimate_input.estimator_metadata:
+        lookup_data_path = estimate_input.estimator_metadata.base_data_path
+    if lookup_data_path is None:
+        logger.warning(
+            "SDK - No lookup data path given. Set it via estimator_metadata.base_data_path in input json. Proceeding with estimator with limited lookup ability."
+        )
+
+    return lookup_data_path
+
+
+def _get_hybrid_estimator(conf: JobConfig, resources: _SharedResources):
     if conf.fm.technique == "lora":
         return HybridLoraEstimator(
             conf.fm,
             conf.hf_training,
             conf.infra,
             conf.peft_lora,
-            lookup_data_path,
-            model_path,
+            resources.lookup_data_path,
+            resources.model_path,
+            lookup_est=resources.lookup_est,
+            reg_est=resources.reg_est,
         )
     elif conf.fm.technique == "qlora":
         return HybridQLoraEstimator(
@@ -39,68 +149,89 @@ def _get_hybrid_estimator(
             conf.peft_lora,
             conf.peft_qlora,
             None,
-            model_path,
+            resources.model_path,
+            reg_est=resources.reg_est,
         )
     else:
         return HybridEstimator(
-            conf.fm, conf.hf_training, conf.infra, lookup_data_path, model_path
+            conf.fm,
+            conf.hf_training,
+            conf.infra,
+            resources.lookup_data_path,
+            resources.model_path,
+            lookup_est=resources.lookup_est,
+            reg_est=resources.reg_est,
         )
 
-def _update_seq_width(
-    conf: JobConfig
-) -> JobConfig:
-    """
-    Update the seq width based on the input dataset characteristics.
 
-    This is only needed for memory and should not impact tps/tokens since those
-    functions anyway operate on the input dataset.
+def _cached(kind: str, job_config: JobConfig, resources: _SharedResources, fn):
+    """Run fn on the job config and resources, through the result cache.
+
+    The key covers the job config as given and the files used by the estimate. On a hit,
+    the job config is updated the same way as estimating it would.
     """
+    cache = get_result_cache()
+    if not cache.enabled:
+        return fn(job_config, resources)
+
+    key = make_cache_key(
+        kind,
+        job_config,
+        input_fingerprints(
+            resources.lookup_data_path,
+            resources.model_path,
+            job_config.fm.base_model_path,
+            job_config.data.dataset,
+            job_config.data.dataset_config_file,
+        ),
+    )
 
-    token_est = None
-    if conf.data.te_approach == 0:
-        token_est = TokenEstimator0(conf.data)
-    if conf.data.te_approach == 2:
-        token_est = TokenEstimator2(conf.data)
+    with span("result_cache"):
+        hit = cache.get(key)
+    if hit is not None:
+        res, updates = hit
+        job_config.fm.block_size = updates["block_size"]
+        job_config.infra.numGpusPerPod = updates["numGpusPerPod"]
+        job_config.hf_training.fsdp = updates["fsdp"]
+        return res
 
-    if token_est != None:
-        data_max_width = token_est.get_max_sample_length()
-        if data_max_width < conf.fm.block_size:
-            conf.fm.block_size = data_max_width
+    res = fn(job_config, resources)
 
-    return conf
+    updates = {
+        "block_size": job_config.fm.block_size,
+        "numGpusPerPod": job_config.infra.numGpusPerPod,
+        "fsdp": job_config.hf_training.fsdp,
+    }
+    cache.put(key, (res, updates))
 
-def estimate_memory(
-    estimate_input: EstimateInput, model_path: str = None
-) -> MemoryEstimate:
-    """Estimate memory needed for training. This method uses hybdrid model by default.
+    return res
 
-    Args:
-        estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
-            This input includes training job configs and optionally, metadata about this estimate run.
-        model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
 
-    Returns:
-        fm_training_estimator.config.arguments.MemoryEstimate: the memory estimate of this run.
+def _as_dict(timings):
+    return timings.as_dict() if timings is not None else None
+
 
+def _update_seq_width(conf: JobConfig, token_est) -> JobConfig:
     """
+    Update the seq width based on the input dataset characteristics.
 
-    if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
-        raise ValueError("Did not receive a training job config")
+    This is only needed for memory and should not impact tps/tokens since those
+    functions anyway operate on the input dataset.
+    """
 
-    # Only going to process first job_config for now
-    job_config = estimate_input.job_configs[0]
+    if token_est != None:
+        data_max_width = token_est.get_max_sample_length()
+        if data_max_width < conf.fm.block_size:
+            conf.fm.block_size = data_max_width
 
-    # Update expected max width based on data
-    job_config = _update_seq_width(job_config)
+    return conf
 
-    if estimate_input.estimator_metadata:
-        lookup_data_path = estimate_input.estimator_metadata.base_data_path
-    if lookup_data_path is None:
-        logger.warning(
-            "SDK - No lookup data path given. Set it via estimator_metadata.base_data_path in input json. Proceeding with estimator with limited lookup ability."
-        )
 
-    est = _get_hybrid_estimator(job_config, model_path, lookup_data_path)
+@timed("memory")
+def _estimate_memory(
+    job_config: JobConfig, resources: _SharedResources
+) -> MemoryEstimate:
+    est = _get_hybrid_estimator(job_config, resources)
 
     total_mem_estimate = fmt_size(est.get_total_mem_estimate())
     activation_memory = fmt_size(est.calculate_activation_memory())
@@ -134,19 +265,62 @@ def estimate_memory(
     )
 
 
+def estimate_memory(
+    estimate_input: EstimateInput, model_path: str = None, profile: bool = False
+) -> MemoryEstimate:
+    """Estimate memory needed for training. This method uses hybdrid model by default.
+
+    Args:
+        estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
+            This input includes training job configs and optionally, metadata about this estimate run.
+        model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+        profile (bool, optional): time the stages of the estimate and return them in the timings field.
+
+    Returns:
+        fm_training_estimator.config.arguments.MemoryEstimate: the memory estimate of this run.
+
+    """
+
+    if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
+        raise ValueError("Did not receive a training job config")
+
+    # Only going to process first job_config, use estimate_batch for all of them
+    job_config = estimate_input.job_configs[0]
+
+    with collect_timings(profile) as timings:
+        resources = _SharedResources(_get_lookup_data_path(estimate_input), model_path)
+        res = _cached("memory", job_config, resources, _estimate_memory_for_data)
+
+    res.timings = _as_dict(timings)
+
+    return res
+
+
+def _estimate_memory_for_data(
+    job_config: JobConfig, resources: _SharedResources
+) -> MemoryEstimate:
+    # Update expected max width based on data
+    job_config = _update_seq_width(
+        job_config, resources.get_token_estimator(job_config.data)
+    )
+
+    return _estimate_memory(job_config, resources)
+
+
+@timed("tokens_and_time")
 def _estimate_tokens_and_time(
-    conf: JobConfig,
-    model_path: str = None,
-    lookup_data_path: str = None,
+    conf: JobConfig, resources: _SharedResources
 ) -> tuple[float, float]:
-    token_est = None
-    if conf.data.te_approach == 0:
-        token_est = TokenEstimator0(conf.data)
-    if conf.data.te_approach == 2:
-        token_est = TokenEstimator2(conf.data)
+    token_est = resources.get_token_estimator(conf.data)
 
     speed_est = HybridSpeedEstimator(
-        conf.fm, conf.hf_training, conf.infra, lookup_data_path, model_path
+        conf.fm,
+        conf.hf_training,
+        conf.infra,
+        resources.lookup_data_path,
+        resources.model_path,
+        lookup_est=resources.lookup_est,
+        reg_est=resources.reg_est,
     )
 
     estimated_tps = speed_est.get_tps()
@@ -189,7 +363,7 @@ def _estimate_tokens_and_time(
 
 
 def estimate_time(
-    estimate_input: EstimateInput, model_path: str = None
+    estimate_input: EstimateInput, model_path: str = None, profile: bool = False
 ) -> TimeEstimate:
     """Estimate time needed for training. This method uses hybdrid model by default.
 
@@ -197,6 +371,7 @@ def estimate_time(
         estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
             This input includes training job configs and optionally, metadata about this estimate run.
         model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+        profile (bool, optional): time the stages of the estimate and return them in the timings field.
 
     Returns:
         fm_training_estimator.config.arguments.TimeEstimate: the time estimate of this run.
@@ -205,25 +380,20 @@ def estimate_time(
     if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
         raise ValueError("Did not receive a training job config")
 
-    # Only going to process first job_config for now
+    # Only going to process first job_config, use estimate_batch for all of them
     job_config = estimate_input.job_configs[0]
 
-    if estimate_input.estimator_metadata:
-        lookup_data_path = estimate_input.estimator_metadata.base_data_path
-    if lookup_data_path is None:
-        logger.warning(
-            "SDK - No lookup data path given. Set it via estimator_metadata.base_data_path in input json. Proceeding with estimator with limited lookup ability."
+    with collect_timings(profile) as timings:
+        resources = _SharedResources(_get_lookup_data_path(estimate_input), model_path)
+        _, (time, train_time) = _cached(
+            "tokens_and_time", job_config, resources, _estimate_tokens_and_time
         )
 
-    _, (time, train_time) = _estimate_tokens_and_time(
-        job_config, model_path, estimate_input.estimator_metadata.base_data_path
-    )
-
-    return TimeEstimate(time, train_time)
+    return TimeEstimate(time, train_time, _as_dict(timings))
 
 
 def estimate_tokens(
-    estimate_input: EstimateInput, model_path: str = None
+    estimate_input: EstimateInput, model_path: str = None, profile: bool = False
 ) -> TokensEstimate:
     """Estimate tokens throughput for a training. This method uses hybdrid model by default.
 
@@ -231,6 +401,7 @@ def estimate_tokens(
         estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
             This input includes training job configs and optionally, metadata about this estimate run.
         model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+        profile (bool, optional): time the stages of the estimate and return them in the timings field.
 
     Returns:
         fm_training_estimator.config.arguments.TokensEstimate: the tokens throughput estimate of this run.
@@ -239,21 +410,163 @@ def estimate_tokens(
     if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
         raise ValueError("Did not receive a training job config")
 
-    # Only going to process first job_config for now
+    # Only going to process first job_config, use estimate_batch for all of them
     job_config = estimate_input.job_configs[0]
 
-    if estimate_input.estimator_metadata:
-        lookup_data_path = estimate_input.estimator_metadata.base_data_path
-    if lookup_data_path is None:
-        logger.warning(
-            "SDK - No lookup data path given. Set it via estimator_metadata.base_data_path in input json. Proceeding with estimator with limited lookup ability."
+    with collect_timings(profile) as timings:
+        resources = _SharedResources(_get_lookup_data_path(estimate_input), model_path)
+        tps, _ = _cached(
+            "tokens_and_time", job_config, resources, _estimate_tokens_and_time
         )
 
-    tps, _ = _estimate_tokens_and_time(
-        job_config, model_path, estimate_input.estimator_metadata.base_data_path
+    return TokensEstimate(tps, _as_dict(timings))
+
+
+def _estimate_job(job_config: JobConfig, resources: _SharedResources) -> Estimate:
+    return _cached("estimate", job_config, resources, _estimate_job_uncached)
+
+
+def _estimate_job_uncached(
+    job_config: JobConfig, resources: _SharedResources
+) -> Estimate:
+    job_config = _update_seq_width(
+        job_config, resources.get_token_estimator(job_config.data)
     )
 
-    return TokensEstimate(tps)
+    # memory goes first, since it fills in the number of gpus if set to auto-discover
+    memory = _estimate_memory(job_config, resources)
+    tps, (time, train_time) = _estimate_tokens_and_time(job_config, resources)
+
+    return Estimate(memory, TimeEstimate(time, train_time), TokensEstimate(tps), None)
+
+
+def estimate(
+    estimate_input: EstimateInput,
+    model_path: str = None,
+    include_theory: bool = False,
+    profile: bool = False,
+) -> Union[Estimate, Tuple[Estimate, Estimate]]:
+    """Estimate memory, time and tokens for a training in a single pass. This method uses hybrid model by default.
+
+    The lookup data, the regression model and the token estimates of the dataset are computed
+    once and shared by all parts of the estimate. The job config in the input is not modified.
+
+    Results are cached, see `fm_training_estimator.utils.get_result_cache`. The key is made of
+    the job config, the environment variables ESTIMATOR_LOOKUP_MAX_DISTANCE and
+    ESTIMATOR_MODEL_MANIFESTS, and the lookup data, model and dataset paths, with the
+    modification time and size of those that are local files or model dirs. Models and datasets
+    from the hub are keyed by their id only, so clear the cache, or set
+    ESTIMATOR_RESULT_CACHE_SIZE to 0, to pick up changes to them within a process.
+
+    Args:
+        estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
+            This input includes training job configs and optionally, metadata about this estimate run.
+        model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+        include_theory (bool, optional): also estimate without the regression model and return both results.
+        profile (bool, optional): time the stages of the estimate and return them in the timings field,
+            separately for the theory and the hybrid estimate.
+
+    Returns:
+        fm_training_estimator.config.arguments.Estimate: the estimate of this run. If include_theory is set,
+            a tuple of the theory only estimate and the hybrid estimate, in that order.
+
+    """
+    if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
+        raise ValueError("Did not receive a training job config")
+
+    # Only going to process first job_config, use estimate_batch for all of them
+    job_config = estimate_input.job_configs[0]
+
+    with collect_timings(profile) as timings:
+        resources = _SharedResources(_get_lookup_data_path(estimate_input), model_path)
+        hybrid = _estimate_job(copy.deepcopy(job_config), resources)
+    hybrid.timings = _as_dict(timings)
+
+    if not include_theory:
+        return hybrid
+
+    # without a regression model, the hybrid estimate is the theory estimate, handed
+    # out as a copy so that changing one of the results leaves the other untouched
+    if resources.reg_est is None:
+        return (copy.deepcopy(hybrid), hybrid)
+
+    with collect_timings(profile) as timings:
+        theory = _estimate_job(copy.deepcopy(job_config), resources.without_regressor())
+    theory.timings = _as_dict(timings)
+
+    return (theory, hybrid)
+
+
+def _estimate_batch_item(
+    job_config: JobConfig, resources: _SharedResources
+) -> BatchEstimateResult:
+    try:
+        return BatchEstimateResult(estimate=_estimate_job(job_config, resources))
+    except Exception as e:  # pylint: disable=broad-except
+        logger.warning("SDK - Failed to estimate job config: %s", e)
+        return BatchEstimateResult(error=f"{type(e).__name__}: {e}")
+
+
+# resources of a worker process in estimate_batch, set up once by the pool initializer
+_worker_resources = None
+
+
+def _init_worker(lookup_data_path: str, model_path: str):
+    global _worker_resources
+    _worker_resources = _SharedResources(lookup_data_path, model_path)
+
+
+def _estimate_batch_item_in_worker(job_config: JobConfig) -> BatchEstimateResult:
+    return _estimate_batch_item(job_config, _worker_resources)
+
+
+def estimate_batch(
+    estimate_input: EstimateInput,
+    model_path: str = None,
+    max_workers: int = None,
+    use_processes: bool = False,
+) -> List[BatchEstimateResult]:
+    """Estimate memory, time and tokens for every job config in the input, using a pool of workers.
+
+    Lookup data, the regression model and token estimators are loaded once and shared by
+    all the job configs (once per worker process, if use_processes is set). The job configs
+    in the input are not modified. The estimates carry no timings, register a span hook to
+    time a batch.
+
+    Args:
+        estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
+            This input includes training job configs and optionally, metadata about this estimate run.
+        model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+        max_workers (int, optional): number of workers in the pool. Defaults to the executor default.
+        use_processes (bool, optional): use a pool of processes instead of threads.
+
+    Returns:
+        List[fm_training_estimator.config.arguments.BatchEstimateResult]: one result per job config,
+            in the same order as the input. A job config that could not be estimated carries the error
+            instead of an estimate.
+
+    """
+    if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
+        raise ValueError("Did not receive a training job config")
+
+    lookup_data_path = _get_lookup_data_path(estimate_input)
+    job_configs = [copy.deepcopy(conf) for conf in estimate_input.job_configs]
+
+    if use_processes:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(lookup_data_path, model_path),
+        ) as executor:
+            return list(executor.map(_estimate_batch_item_in_worker, job_configs))
+
+    resources = _SharedResources(lookup_data_path, model_path)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(
+                partial(_estimate_batch_item, resources=resources), job_configs
+            )
+        )
 
 
 def estimate_cost(
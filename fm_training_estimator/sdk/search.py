@@ -0,0 +1,145 @@
+# Standard
+from typing import Sequence
+import copy
+
+# Third Party
+import numpy
+import pandas
+
+# First Party
+from fm_training_estimator.config.arguments import EstimateInput
+
+# Local
+from ..utils import logger
+from .sdk import _get_lookup_data_path, _SharedResources
+from .sweep import _sweep_block_size, _sweep_memory, _sweep_tokens_and_time
+
+
+def search(
+    estimate_input: EstimateInput,
+    batch_sizes: Sequence[int],
+    num_gpus: Sequence[int],
+    gradient_checkpointing: Sequence[bool] = (False, True),
+    fsdp_strategies: Sequence[str] = ("full_shard", "shard_grad_op"),
+    model_path: str = None,
+) -> pandas.DataFrame:
+    """Search for the configurations of a training that need the fewest gpu hours.
+
+    The first job config in the input is the base of the search, which fixes the model,
+    dataset, technique, seq len and gpu type. Every combination of fsdp strategy, gradient
+    checkpointing, batch size and number of gpus is checked against the same hybrid memory
+    model as estimate. For every strategy and number of gpus, batch sizes larger than the
+    first one that does not fit in gpu memory are pruned without further checks, and tokens
+    and time are only estimated for the configurations that fit. The rows carry no timings,
+    see the profiling section of the sdk README to trace a search.
+
+    Args:
+        estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
+            This input includes training job configs and optionally, metadata about this estimate run.
+        batch_sizes (Sequence[int]): per device batch sizes to search over.
+        num_gpus (Sequence[int]): number of gpus to search over.
+        gradient_checkpointing (Sequence[bool], optional): gradient checkpointing settings to search over.
+        fsdp_strategies (Sequence[str], optional): fsdp sharding strategies to search over. Only used
+            for full fine tuning.
+        model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+
+    Returns:
+        pandas.DataFrame: the configurations that fit in gpu memory, cheapest first, with their memory,
+            tps, time in seconds and gpu hours (time x number of gpus). Ties are broken by fewer gpus
+            and then by not using gradient checkpointing, whose recomputation cost is not part of the
+            time estimate.
+
+    """
+    if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
+        raise ValueError("Did not receive a training job config")
+
+    if min(num_gpus) < 1:
+        raise ValueError(
+            "Search needs explicit number of gpus, auto discovery is not supported"
+        )
+
+    job_config = estimate_input.job_configs[0]
+    resources = _SharedResources(_get_lookup_data_path(estimate_input), model_path)
+
+    token_est = resources.get_token_estimator(job_config.data)
+    if token_est is None:
+        raise ValueError("Search needs a dataset to estimate the training time")
+
+    # batch sizes vary fastest, in increasing order, so that pruning can work along rows
+    g, b = (
+        a.ravel()
+        for a in numpy.meshgrid(
+            numpy.asarray(num_gpus),
+            numpy.sort(numpy.asarray(batch_sizes)),
+            indexing="ij",
+        )
+    )
+    s = numpy.full(len(b), job_config.fm.block_size)
+    block_size = _sweep_block_size(token_est, s)
+
+    # fsdp only applies to full fine tuning
+    if job_config.fm.technique in ("lora", "qlora"):
+        fsdp_strategies = [None]
+
+    frames = []
+    for fsdp in fsdp_strategies:
+        for gc in gradient_checkpointing:
+            conf = copy.deepcopy(job_config)
+            conf.hf_training.gradient_checkpointing = gc
+            if fsdp is not None:
+                conf.hf_training.fsdp = [fsdp]
+
+            mem = _sweep_memory(conf, resources, g, b, block_size)
+
+            # memory grows with the batch size, so once a batch size does not fit on
+            # a number of gpus, none of the larger ones do either
+            fits = numpy.logical_and.accumulate(
+                mem["fits"].reshape(len(num_gpus), -1), axis=1
+            ).ravel()
+            logger.debug(
+                "SDK - Search with fsdp %s, gradient checkpointing %s: %d of %d fit",
+                fsdp,
+                gc,
+                fits.sum(),
+                len(fits),
+            )
+            if not fits.any():
+                continue
+
+            res = _sweep_tokens_and_time(
+                conf, resources, token_est, g[fits], b[fits], block_size[fits]
+            )
+            frames.append(
+                pandas.DataFrame(
+                    {
+                        "fsdp": fsdp,
+                        "gradient_checkpointing": gc,
+                        "batch_size": b[fits],
+                        "num_gpus": g[fits],
+                        "total_mem_estimate": mem["total_mem_estimate"][fits],
+                        **res,
+                        "gpu_hours": res["time"] * g[fits] / 3600,
+                    }
+                )
+            )
+
+    if len(frames) == 0:
+        logger.warning("SDK - Search found no configuration that fits in gpu memory")
+        return pandas.DataFrame(
+            columns=[
+                "fsdp",
+                "gradient_checkpointing",
+                "batch_size",
+                "num_gpus",
+                "total_mem_estimate",
+                "tps",
+                "time",
+                "train_time",
+                "gpu_hours",
+            ]
+        )
+
+    res = pandas.concat(frames, ignore_index=True)
+    return res.sort_values(
+        ["gpu_hours", "num_gpus", "gradient_checkpointing"], ignore_index=True
+    )
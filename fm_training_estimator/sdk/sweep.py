@@ -0,0 +1,332 @@
+# Standard
+from typing import List, Sequence
+import copy
+
+# Third Party
+import numpy
+import pandas
+
+# First Party
+from fm_training_estimator.config.arguments import EstimateInput, JobConfig
+from fm_training_estimator.memory.lora import LoraEstimator
+from fm_training_estimator.memory.qlora import QLoraEstimator
+from fm_training_estimator.memory.vectorized import VectorizedMemoryEstimator
+from fm_training_estimator.time import get_total_time
+
+# Local
+from ..config import is_fsdp
+from ..data import format_query
+from ..utils import logger
+from .sdk import _get_lookup_data_path, _SharedResources
+
+
+def _query_frame(
+    conf: JobConfig, version: str, num_gpus, batch_size, seq_len
+) -> pandas.DataFrame:
+    """Build one lookup/regression query per grid point, in the column order of the data format."""
+    base = {
+        "model_name": conf.fm.base_model_path,
+        "number_gpus": 0,
+        "batch_size": 0,
+        "seq_len": 0,
+        "gpu_model": conf.infra.gpuModel,
+        "method": conf.fm.technique,
+    }
+    # model features are the same for every grid point, so format a single query
+    query = format_query(base, version)
+
+    n = len(batch_size)
+    frame = pandas.DataFrame({k: [v] * n for k, v in query.items()})
+    for k, v in (
+        ("number_gpus", num_gpus),
+        ("batch_size", batch_size),
+        ("seq_len", seq_len),
+    ):
+        if k in frame:
+            frame[k] = v
+
+    return frame
+
+
+def _lookup(conf, resources, target, num_gpus, batch_size, seq_len):
+    res = numpy.full(len(batch_size), numpy.nan)
+    if resources.lookup_est is None:
+        return res
+
+    query = _query_frame(
+        conf, resources.lookup_est.get_data_format(), num_gpus, batch_size, seq_len
+    )
+    found = resources.lookup_est.run_batch(query)
+    if target in found:
+        res = found[target].to_numpy(dtype=float)
+
+    # same as the hybrid estimators, interpolate where nothing was measured
+    for i in numpy.flatnonzero(numpy.isnan(res)):
+        val = resources.lookup_est.interpolate(query.iloc[i].to_dict(), target)
+        if val is not None:
+            res[i] = val
+
+    return res
+
+
+def _regress(conf, resources, target, num_gpus, batch_size, seq_len):
+    query = _query_frame(
+        conf, resources.reg_est.get_data_format(), num_gpus, batch_size, seq_len
+    )
+    rows = list(query.itertuples(index=False, name=None))
+
+    res = resources.reg_est.run_batch(rows, [target])[target]
+    return numpy.asarray(res, dtype=float)
+
+
+def _lookup_then_regress(conf, resources, target, num_gpus, batch_size, seq_len):
+    """Same order as the hybrid estimators: lookup first, the model for the misses."""
+    res = _lookup(conf, resources, target, num_gpus, batch_size, seq_len)
+
+    missing = numpy.isnan(res)
+    if resources.reg_est is not None and missing.any():
+        res[missing] = _regress(
+            conf,
+            resources,
+            target,
+            num_gpus[missing],
+            batch_size[missing],
+            seq_len[missing],
+        )
+
+    return res
+
+
+def _sweep_full_memory(conf: JobConfig, resources, num_gpus, batch_size, seq_len):
+    """Memory of full fine tuning, following HybridEstimator."""
+    est = VectorizedMemoryEstimator(conf.fm, conf.hf_training)
+
+    # fsdp is switched on with full_shard for any number of gpus other than 1
+    fsdp = (num_gpus != 1) | is_fsdp(conf.hf_training)
+    strategy = (
+        "shard_grad_op" if "shard_grad_op" in conf.hf_training.fsdp else "full_shard"
+    )
+
+    theory = est.estimate(batch_size, seq_len)
+    act = theory["activation_memory"]
+    grad = theory["gradient_memory"]
+    model = theory["model_memory"]
+    opt = theory["optimizer_memory"]
+
+    sharded = est.estimate(batch_size, seq_len, num_gpus, fsdp=strategy)
+    fsdp_act = act
+    if resources.reg_est is not None:
+        fsdp_act = _regress(
+            conf, resources, "memory_act", num_gpus, batch_size, seq_len
+        )
+    fsdp_grad = sharded["gradient_memory"]
+    fsdp_model = sharded["model_memory"]
+    fsdp_opt = sharded["optimizer_memory"]
+
+    fsdp_total = _lookup(conf, resources, "memory", num_gpus, batch_size, seq_len)
+    fsdp_total = numpy.where(
+        numpy.isnan(fsdp_total),
+        fsdp_act + fsdp_grad + fsdp_model + fsdp_opt,
+        fsdp_total,
+    )
+
+    def pick(fsdp_val, full_val):
+        return numpy.where(fsdp, fsdp_val, full_val).astype(float)
+
+    return {
+        "total_mem_estimate": pick(fsdp_total, act + grad + model + opt),
+        "activation_memory": pick(fsdp_act, act),
+        "gradient_memory": pick(fsdp_grad, grad),
+        "model_memory": pick(fsdp_model, model),
+        "optimizer_memory": pick(fsdp_opt, opt),
+    }
+
+
+def _sweep_lora_memory(conf: JobConfig, resources, num_gpus, batch_size, seq_len):
+    """Memory of LoRA and QLoRA tuning, following HybridLoraEstimator and HybridQLoraEstimator."""
+    if conf.fm.technique == "qlora":
+        est = QLoraEstimator(conf.fm, conf.hf_training, conf.peft_lora, conf.peft_qlora)
+        # the sdk does not use lookup data for qlora
+        resources = resources.without_lookup()
+    else:
+        est = LoraEstimator(conf.fm, conf.hf_training, conf.peft_lora)
+
+    est.b = batch_size
+    est.s = numpy.minimum(seq_len, est.model_max_length)
+
+    act = est.calculate_activation_memory()
+    grad = est.calculate_gradient_memory()
+    model = est.calculate_model_memory()
+    opt = est.calculate_optimizer_memory()
+
+    total = _lookup_then_regress(
+        conf, resources, "memory", num_gpus, batch_size, seq_len
+    )
+    # there is no theory fall back for qlora
+    if conf.fm.technique != "qlora":
+        total = numpy.where(
+            numpy.isnan(total), act / num_gpus + grad + model + opt, total
+        )
+
+    ones = numpy.ones(len(batch_size))
+    return {
+        "total_mem_estimate": total,
+        "activation_memory": act / num_gpus,
+        "gradient_memory": grad / num_gpus * ones,
+        "model_memory": model / num_gpus * ones,
+        "optimizer_memory": opt / num_gpus * ones,
+    }
+
+
+def _sweep_block_size(token_est, seq_len):
+    # same as the sdk, the seq len is capped by the longest sample in the data
+    if token_est is not None:
+        return numpy.minimum(seq_len, token_est.get_max_sample_length())
+    return seq_len
+
+
+def _sweep_memory(conf: JobConfig, resources, num_gpus, batch_size, block_size):
+    if conf.fm.technique in ("lora", "qlora"):
+        res = _sweep_lora_memory(conf, resources, num_gpus, batch_size, block_size)
+    else:
+        res = _sweep_full_memory(conf, resources, num_gpus, batch_size, block_size)
+
+    gpu_memory = conf.infra.gpu_memory_in_gb * 1024**3
+    res["fits"] = res["total_mem_estimate"] < gpu_memory
+
+    return res
+
+
+def _sweep_tokens_and_time(
+    conf: JobConfig, resources, token_est, num_gpus, batch_size, block_size
+):
+    # the tps is measured at the expected batch width of the data
+    tps_seq_len = block_size
+    if token_est is not None:
+        widths = {
+            bs: int(token_est.get_estimated_batch_width(int(bs)))
+            for bs in numpy.unique(batch_size)
+        }
+        tps_seq_len = numpy.array([widths[bs] for bs in batch_size])
+
+    if resources.lookup_est is None and resources.reg_est is None:
+        tps = numpy.full(len(batch_size), numpy.nan)
+    else:
+        tps = _lookup_then_regress(
+            conf, resources, "tokens_per_second", num_gpus, batch_size, tps_seq_len
+        )
+        # the sdk defaults to 1 when the tps could not be calculated
+        tps = numpy.where(numpy.isnan(tps), 1, tps)
+
+    if token_est is not None:
+        hf = copy.copy(conf.hf_training)
+        hf.per_device_train_batch_size = batch_size
+        ia = copy.copy(conf.infra)
+        ia.numGpusPerPod = num_gpus
+        time, train_time = get_total_time(
+            hf, ia, token_est, tps, int(token_est.get_total_tokens())
+        )
+    else:
+        time, train_time = 0, 0
+
+    ones = numpy.ones(len(batch_size))
+    return {"tps": tps, "time": time * ones, "train_time": train_time * ones}
+
+
+def _sweep_technique(
+    job_config: JobConfig,
+    technique: str,
+    resources: _SharedResources,
+    num_gpus,
+    batch_size,
+    seq_len,
+):
+    conf = copy.deepcopy(job_config)
+    conf.fm.technique = technique
+
+    token_est = resources.get_token_estimator(conf.data)
+    block_size = _sweep_block_size(token_est, seq_len)
+
+    res = _sweep_memory(conf, resources, num_gpus, batch_size, block_size)
+    res.update(
+        _sweep_tokens_and_time(
+            conf, resources, token_est, num_gpus, batch_size, block_size
+        )
+    )
+
+    return res
+
+
+def sweep(
+    estimate_input: EstimateInput,
+    batch_sizes: Sequence[int],
+    seq_lens: Sequence[int],
+    num_gpus: Sequence[int],
+    techniques: List[str] = None,
+    model_path: str = None,
+) -> pandas.DataFrame:
+    """Estimate memory, tokens and time for every point of a grid of configurations.
+
+    The first job config in the input is the base of the sweep. Every combination of
+    technique, batch size (per_device_train_batch_size), seq len (block_size) and number
+    of gpus (numGpusPerPod) is estimated, with the same hybrid logic as estimate. Theory
+    formulas are evaluated over the whole grid at once and the lookup data and regression
+    model are queried in batches. Stages are not timed per grid point, see the profiling
+    section of the sdk README to trace a sweep.
+
+    Args:
+        estimate_input (fm_training_estimator.config.arguments.EstimateInput): the input for this estimation
+            This input includes training job configs and optionally, metadata about this estimate run.
+        batch_sizes (Sequence[int]): per device batch sizes to sweep over.
+        seq_lens (Sequence[int]): sequence lengths to sweep over.
+        num_gpus (Sequence[int]): number of gpus to sweep over. Auto discovery (0) is not supported.
+        techniques (List[str], optional): tuning techniques to sweep over, out of full, lora and qlora.
+            Defaults to the technique of the job config.
+        model_path (str, optional): path to the trained xgboost model for the estimator to use for this run.
+
+    Returns:
+        pandas.DataFrame: one row per grid point, with the memory components in bytes, whether the
+            memory fits on the gpu, tps and time in seconds. tps is NaN without lookup data and a model.
+
+    """
+    if estimate_input.job_configs is None or len(estimate_input.job_configs) == 0:
+        raise ValueError("Did not receive a training job config")
+
+    if min(num_gpus) < 1:
+        raise ValueError(
+            "Sweep needs explicit number of gpus, auto discovery is not supported"
+        )
+
+    job_config = estimate_input.job_configs[0]
+    if techniques is None:
+        techniques = [job_config.fm.technique]
+
+    resources = _SharedResources(_get_lookup_data_path(estimate_input), model_path)
+
+    b, s, g = (
+        a.ravel()
+        for a in numpy.meshgrid(
+            numpy.asarray(batch_sizes),
+            numpy.asarray(seq_lens),
+            numpy.asarray(num_gpus),
+            indexing="ij",
+        )
+    )
+    logger.info("SDK - Sweeping %d points per technique", len(b))
+
+    frames = []
+    for technique in techniques:
+        res = _sweep_technique(job_config, technique, resources, g, b, s)
+        frames.append(
+            pandas.DataFrame(
+                {
+                    "technique": technique,
+                    "batch_size": b,
+                    "seq_len": s,
+                    "num_gpus": g,
+                    **res,
+                }
+            )
+        )
+
+    return pandas.concat(frames, ignore_index=True)
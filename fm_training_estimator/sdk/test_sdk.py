@@ -0,0 +1,114 @@
+# Standard
+from pathlib import Path
+
+# Local
+from ..config.arguments import (
+    DataArguments,
+    EstimateInput,
+    EstimatorMetadata,
+    FMArguments,
+    HFTrainingArguments,
+    InfraArguments,
+    JobConfig,
+)
+from ..regressor import XGBoostRegressor
+from .sdk import estimate, estimate_batch
+
+test_data2 = (Path(__file__).parent / "../regressor/test_data/data2.csv").as_posix()
+
+
+def _job_config(base_model_path, num_gpus):
+    return JobConfig(
+        HFTrainingArguments(per_device_train_batch_size=4),
+        FMArguments(base_model_path=base_model_path, block_size=512),
+        DataArguments(te_approach=-1),
+        InfraArguments(numGpusPerPod=num_gpus),
+    )
+
+
+def test_estimate_batch():
+    job_configs = [
+        _job_config("ibm-granite/granite-7b-base", 2),
+        _job_config("./no-such-model", 2),
+        _job_config("ibm-granite/granite-7b-base", 1),
+    ]
+    est_input = EstimateInput(
+        job_configs=job_configs,
+        estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+    )
+
+    res = estimate_batch(est_input, max_workers=2)
+
+    # results are in input order, with errors reported per job config
+    assert len(res) == 3
+    assert res[0].error is None
+    assert res[0].estimate.tokens.tps == 500
+    assert res[0].estimate.memory.num_gpus == 2
+    assert res[1].estimate is None
+    assert res[1].error is not None
+    assert res[2].estimate.memory.num_gpus == 1
+
+    # the input job configs are left untouched
+    assert job_configs[0].hf_training.fsdp == []
+
+
+def test_estimate_batch_processes():
+    job_configs = [
+        _job_config("ibm-granite/granite-7b-base", 2),
+        _job_config("ibm-granite/granite-7b-base", 1),
+    ]
+    est_input = EstimateInput(
+        job_configs=job_configs,
+        estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+    )
+
+    res = estimate_batch(est_input, max_workers=2, use_processes=True)
+
+    # workers in other processes estimate the same as a single estimate
+    assert len(res) == 2
+    for r, job_config in zip(res, job_configs):
+        assert r.error is None
+        single = estimate(
+            EstimateInput(
+                job_configs=[job_config],
+                estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+            )
+        )
+        assert r.estimate == single
+
+
+def test_estimate():
+    job_config = _job_config("ibm-granite/granite-7b-base", 2)
+    est_input = EstimateInput(
+        job_configs=[job_config],
+        estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+    )
+
+    res = estimate(est_input)
+    assert res.tokens.tps == 500
+    assert res.memory.num_gpus == 2
+
+    # without a regression model, theory and hybrid estimates match
+    theory, hybrid = estimate(est_input, include_theory=True)
+    assert theory == hybrid
+    assert theory is not hybrid
+    assert theory.memory is not hybrid.memory
+
+    assert job_config.hf_training.fsdp == []
+
+
+def test_estimate_include_theory(tmp_path):
+    model_path = tmp_path / "test.model.json"
+    reg = XGBoostRegressor()
+    reg.train(test_data2, model_path, ["tokens_per_second", "memory", "memory_act"])
+
+    # 4 gpus are not in the lookup data, so the hybrid estimate comes from the model
+    job_config = _job_config("ibm-granite/granite-7b-base", 4)
+    est_input = EstimateInput(
+        job_configs=[job_config],
+        estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+    )
+
+    theory, hybrid = estimate(est_input, model_path.as_posix(), include_theory=True)
+    assert theory.tokens.tps != hybrid.tokens.tps
+    assert hybrid == estimate(est_input, model_path.as_posix())
@@ -0,0 +1,40 @@
+# Standard
+from pathlib import Path
+
+# Local
+from ..config.arguments import (
+    DataArguments,
+    EstimateInput,
+    EstimatorMetadata,
+    FMArguments,
+    HFTrainingArguments,
+    InfraArguments,
+    JobConfig,
+)
+from .search import search
+
+test_data2 = (Path(__file__).parent / "../regressor/test_data/data2.csv").as_posix()
+test_dataset = (Path(__file__).parent / "../tokens/te0/te_test1.jsonl").as_posix()
+
+
+def test_search():
+    job_config = JobConfig(
+        HFTrainingArguments(),
+        FMArguments(base_model_path="ibm-granite/granite-7b-base", block_size=512),
+        DataArguments(te_approach=0, dataset=test_dataset),
+        InfraArguments(gpu_memory_in_gb=40),
+    )
+    est_input = EstimateInput(
+        job_configs=[job_config],
+        estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+    )
+
+    res = search(est_input, batch_sizes=[1, 2, 4, 8], num_gpus=[1, 2, 4, 8])
+
+    # a 7b model does not fit on a single 40GB gpu
+    assert len(res) > 0
+    assert (res["num_gpus"] > 1).all()
+    assert (res["total_mem_estimate"] < 40 * 1024**3).all()
+
+    # cheapest first
+    assert res["gpu_hours"].is_monotonic_increasing
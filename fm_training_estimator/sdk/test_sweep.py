@@ -0,0 +1,50 @@
+# Standard
+from pathlib import Path
+
+# Local
+from ..config.arguments import (
+    DataArguments,
+    EstimateInput,
+    EstimatorMetadata,
+    FMArguments,
+    HFTrainingArguments,
+    InfraArguments,
+    JobConfig,
+)
+from ..utils import fmt_size
+from .sdk import estimate
+from .sweep import sweep
+
+test_data2 = (Path(__file__).parent / "../regressor/test_data/data2.csv").as_posix()
+
+
+def _input(batch_size, seq_len, num_gpus):
+    job_config = JobConfig(
+        HFTrainingArguments(per_device_train_batch_size=batch_size),
+        FMArguments(base_model_path="ibm-granite/granite-7b-base", block_size=seq_len),
+        DataArguments(te_approach=-1),
+        InfraArguments(numGpusPerPod=num_gpus),
+    )
+    return EstimateInput(
+        job_configs=[job_config],
+        estimator_metadata=EstimatorMetadata(base_data_path=test_data2),
+    )
+
+
+def test_sweep():
+    res = sweep(
+        _input(4, 512, 1),
+        batch_sizes=[2, 4],
+        seq_lens=[512, 1024],
+        num_gpus=[1, 2],
+        techniques=["full", "lora"],
+    )
+
+    assert len(res) == 16
+    assert set(res["technique"]) == {"full", "lora"}
+
+    # every grid point matches a single estimate of the same config
+    for row in res[res["technique"] == "full"].itertuples():
+        est = estimate(_input(row.batch_size, row.seq_len, row.num_gpus))
+        assert fmt_size(row.total_mem_estimate) == est.memory.total_mem_estimate
+        assert row.tps == est.tokens.tps
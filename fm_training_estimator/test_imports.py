@@ -0,0 +1,28 @@
+# Standard
+import subprocess
+import sys
+
+# modules that should only be loaded by the code paths that need them
+HEAVY_MODULES = ["peft", "datasets", "xgboost", "sklearn", "orchestrator", "gradio"]
+
+
+def _loaded_after_import(module):
+    script = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip().splitlines()[-1] if out.stdout.strip() else ""
+
+
+def test_lazy_imports():
+    for module in [
+        "fm_training_estimator.sdk",
+        "fm_training_estimator.ui.cli",
+        "fm_training_estimator.memory",
+        "fm_training_estimator.regressor",
+        "fm_training_estimator.tokens",
+    ]:
+        assert _loaded_after_import(module) == "", module
@@ -1,7 +1,7 @@
 # Local
 from ...config import FMArguments, HFTrainingArguments, InfraArguments
 from ...data import format_query
-from ...regressor import LookupRegressor, GetRegressor
+from ...regressor import get_shared_lookup_regressor, get_shared_regressor
 from ...utils import logger
 
 
@@ -13,23 +13,25 @@ class HybridSpeedEstimator:
         infra_args: InfraArguments,
         lookup_data_path,
         model_path,
+        lookup_est=None,
+        reg_est=None,
     ):
 
         self.fm = fm_args
         self.ta = train_args
         self.ia = infra_args
-        self.lookup_est = None
-        self.reg_est = None
+        self.lookup_est = lookup_est
+        self.reg_est = reg_est
 
         # Lookup based estimator
-        if lookup_data_path is not None:
-            self.lookup_est = LookupRegressor(lookup_data_path)
+        if self.lookup_est is None and lookup_data_path is not None:
+            self.lookup_est = get_shared_lookup_regressor(lookup_data_path)
 
         # Model based estimator
-        if model_path is not None:
-            self.reg_est = GetRegressor(model_path)
+        if self.reg_est is None and model_path is not None:
+            self.reg_est = get_shared_regressor(model_path)
 
-        if lookup_data_path is None and model_path is None:
+        if self.lookup_est is None and self.reg_est is None:
             raise RuntimeError("HybridSpeedEstimator not properly initialized")
 
     def check_lookup(self, seqlen):
@@ -44,13 +46,14 @@ class HybridSpeedEstimator:
 
         lookup_query = format_query(lookup_query, self.lookup_est.get_data_format())
 
-        res = self.lookup_est.run(lookup_query)
+        res = self.lookup_est.lookup(lookup_query)
 
-        if res.empty:
-            return None
+        if res is None:
+            # no measurement of this config, so interpolate between neighbours
+            return self.lookup_est.interpolate(lookup_query, "tokens_per_second")
 
         logger.debug(f"Throughput Hybrid - Lookup result: {res}")
-        return res[0:1]["tokens_per_second"].item()
+        return res["tokens_per_second"]
 
     def get_tps(self, seqlen=None):
         if seqlen is None:
@@ -1,4 +1,19 @@
+# Standard
+import importlib
+
 # Local
 from .te import TokenEstimator
-from .te0 import TokenEstimator0
-from .te2 import TokenEstimator2
+
+# the estimators load datasets and sklearn, so they are imported on first use
+_lazy_attrs = {
+    "TokenEstimator0": ".te0",
+    "TokenEstimator2": ".te2",
+}
+
+__all__ = ["TokenEstimator", *_lazy_attrs]
+
+
+def __getattr__(name):
+    if name in _lazy_attrs:
+        return getattr(importlib.import_module(_lazy_attrs[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,7 +5,7 @@ import numpy as np
 
 # Local
 from ...config import DataArguments
-from ...utils import logger
+from ...utils import logger, span
 from ..te import TokenEstimator
 
 RUNS = 5
@@ -19,22 +19,24 @@ class TokenEstimator0(TokenEstimator):
         if da.dataset is None:
             raise RuntimeError("Dataset argument has to be filled in for TE0!")
 
-        if da.dataset.endswith(".json") or da.dataset.endswith(".jsonl"):
-            logger.debug("Tokens TE0 - Parsing dataset as local json file")
-            dataset = load_dataset("json", data_files={"train": da.dataset})["train"]
-        else:
-            dataset = load_dataset(
-                da.dataset,
-                name=da.dataset_config_name,
-                split=da.dataset_split,
-                trust_remote_code=da.trust_remote_code
-            )
+        with span("dataset_load"):
+            if da.dataset.endswith(".json") or da.dataset.endswith(".jsonl"):
+                logger.debug("Tokens TE0 - Parsing dataset as local json file")
+                dataset = load_dataset("json", data_files={"train": da.dataset})["train"]
+            else:
+                dataset = load_dataset(
+                    da.dataset,
+                    name=da.dataset_config_name,
+                    split=da.dataset_split,
+                    trust_remote_code=da.trust_remote_code
+                )
 
         tokens = []
         logger.info("Tokens TE0 - Loading data in dataset...")
-        for item in tqdm(dataset):
-            txt = da.dataset_text_field.format_map(item)
-            tokens.append(int(len(txt) / 3.6))
+        with span("dataset_tokens"):
+            for item in tqdm(dataset):
+                txt = da.dataset_text_field.format_map(item)
+                tokens.append(int(len(txt) / 3.6))
 
         self.tokens = tokens
 
@@ -9,7 +9,7 @@ from sklearn.linear_model import LinearRegression
 
 # Local
 from ...config import DataArguments
-from ...utils import logger
+from ...utils import logger, span
 from ..te import TokenEstimator
 
 
@@ -37,7 +37,8 @@ class TokenEstimator2(TokenEstimator):
 
         if da.dataset_config_file.endswith(".json"):
             logger.info("Parsing dataset configuration as local json file")
-            contracts = load_dataset_config_from_json(da.dataset_config_file)
+            with span("dataset_contract"):
+                contracts = load_dataset_config_from_json(da.dataset_config_file)
         else:
             raise RuntimeError("Please upload dataset configuration in correct JSON format!")
 
@@ -1,2 +1,16 @@
-# Local
-from .core import run
+# Standard
+import importlib
+
+# imported on first use, so that importing the package to run one of its modules
+# does not load every estimator up front
+_lazy_attrs = {
+    "run": ".core",
+}
+
+__all__ = list(_lazy_attrs)
+
+
+def __getattr__(name):
+    if name in _lazy_attrs:
+        return getattr(importlib.import_module(_lazy_attrs[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,26 +9,34 @@ import fire
 import uvicorn
 
 # Local
+from ..utils import configure_result_cache, get_result_cache
 from .core import run
 
 
-def api(data_path, model_path):
+def api(data_path, model_path, cache_path=None):
     app = FastAPI()
 
+    if cache_path is not None:
+        configure_result_cache(sqlite_path=cache_path)
+
     @app.post("/api/estimate")
-    def estimate(config: Any = Body()):
+    def estimate(config: Any = Body(), profile: bool = False):
         conf = json.loads(config)
-        output = run(conf, data_path, model_path)
+        output = run(conf, data_path, model_path, profile=profile)
         # this default float business is needed to deal with numpy.float32
         # types present in the output json which don't serialize out of the box
         return json.dumps(output, default=float)
 
+    @app.get("/api/cache")
+    def cache_stats():
+        return get_result_cache().stats()
+
     return app
 
 
-def run_api(data_path=None, model_path=None, port=3000):
+def run_api(data_path=None, model_path=None, port=3000, cache_path=None):
 
-    app = api(data_path, model_path)
+    app = api(data_path, model_path, cache_path)
     uvicorn.run(app, host="0.0.0.0", port=port)
 
 
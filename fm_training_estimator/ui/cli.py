@@ -8,6 +8,7 @@ import logging
 import fire
 
 # Local
+from ..utils import configure_result_cache
 from .core import run
 
 
@@ -17,14 +18,20 @@ def run_cli(
     log_level: str = "INFO",
     lookup_data_path: Optional[str] = None,
     model_path: Optional[str] = None,
+    cache_path: Optional[str] = None,
+    profile: bool = False,
 ):
     """Run the CLI."""
     log_level = log_level.upper()
     logging.basicConfig(level=log_level)
+    if cache_path is not None:
+        # keep results across runs of the cli in a local SQLite file
+        configure_result_cache(sqlite_path=cache_path)
     output = run(
         config=config,
         lookup_data_path=lookup_data_path,
         model_path=model_path,
+        profile=profile,
     )
     output_json = json.dumps(output, indent=4)
     if output_path == "":
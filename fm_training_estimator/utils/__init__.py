@@ -1,5 +1,32 @@
 # Local
-from .model import extract_model_features, get_model_max_length
+from .cache import (
+    ResultCache,
+    configure_result_cache,
+    fingerprint,
+    get_result_cache,
+    input_fingerprints,
+    make_cache_key,
+)
+from .manifest import (
+    get_model_manifest,
+    get_model_manifest_dir,
+    save_model_manifest,
+)
+from .model import (
+    clear_model_config_cache,
+    extract_model_features,
+    get_model_config,
+    get_model_max_length,
+)
+from .profiling import (
+    SpanHook,
+    Timings,
+    add_span_hook,
+    collect_timings,
+    remove_span_hook,
+    span,
+    timed,
+)
 from .utils import (
     fmt_size,
     get_human_readable_number,
@@ -14,6 +41,24 @@ __all__ = [
     "get_human_readable_number",
     "fmt_size",
     "get_model_max_length",
+    "get_model_config",
+    "clear_model_config_cache",
+    "get_model_manifest",
+    "get_model_manifest_dir",
+    "save_model_manifest",
+    "ResultCache",
+    "configure_result_cache",
+    "get_result_cache",
+    "make_cache_key",
+    "fingerprint",
+    "input_fingerprints",
     "logger",
     "extract_model_features",
+    "SpanHook",
+    "Timings",
+    "add_span_hook",
+    "remove_span_hook",
+    "collect_timings",
+    "span",
+    "timed",
 ]
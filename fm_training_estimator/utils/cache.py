@@ -0,0 +1,212 @@
+# Standard
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+import copy
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+
+# fields that change between otherwise identical configs without changing the estimate,
+# eg, the HF logging_dir defaults to a path with the current timestamp
+_VOLATILE_FIELDS = {"logging_dir"}
+
+# environment variables that change estimates, eg, how far lookups interpolate and
+# where model manifests are read from
+_RESULT_SETTINGS = ("ESTIMATOR_LOOKUP_MAX_DISTANCE", "ESTIMATOR_MODEL_MANIFESTS")
+
+
+def fingerprint(path: str) -> Tuple[int, int]:
+    """return a cheap fingerprint of a file, which changes when the file is rewritten
+
+    Args:
+        path (str): path to the file
+
+    Returns:
+        Tuple[int, int]: modification time in ns and size in bytes of the file
+    """
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def input_fingerprints(*paths: Optional[str]) -> list:
+    """return fingerprints of the files behind the given paths
+
+    Local files are fingerprinted directly and local model dirs through their
+    config.json. Anything else, like hub ids, is kept as is.
+    """
+    res = []
+    for path in paths:
+        if path is None:
+            res.append(None)
+        elif os.path.isfile(path):
+            res.append((os.path.abspath(path), fingerprint(path)))
+        elif os.path.isfile(os.path.join(path, "config.json")):
+            res.append(
+                (os.path.abspath(path), fingerprint(os.path.join(path, "config.json")))
+            )
+        else:
+            res.append((path, None))
+    return res
+
+
+def _canonical(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            f.name: _canonical(getattr(obj, f.name))
+            for f in dataclasses.fields(obj)
+            if f.name not in _VOLATILE_FIELDS
+        }
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    return obj
+
+
+def make_cache_key(*parts: Any) -> str:
+    """return a canonical hash of the given parts, eg, parsed argument dataclasses
+
+    Equal configs give the same key regardless of field order or of when they were
+    parsed. The environment variables the estimates depend on are part of the key.
+    """
+    settings = {name: os.getenv(name) for name in _RESULT_SETTINGS}
+    data = json.dumps(_canonical([settings, *parts]), sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class ResultCache:
+    """Cache of estimation results, with an in-memory LRU tier and an optional SQLite tier.
+
+    Values are copied on the way in and out, so callers are free to modify them.
+    The SQLite tier is shared across processes and runs using the same file.
+    """
+
+    def __init__(self, maxsize: int = 256, sqlite_path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.sqlite_path = sqlite_path
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.sqlite_path is not None:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)"
+                )
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 or self.sqlite_path is not None
+
+    @contextmanager
+    def _connect(self):
+        # commits on success, rolls back on errors, and closes the connection either way
+        with closing(sqlite3.connect(self.sqlite_path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def _put_memory(self, key: str, value: Any):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Any:
+        """return the cached value for the key, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+
+        if self.sqlite_path is not None:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                value = pickle.loads(row[0])
+                with self._lock:
+                    self._put_memory(key, value)
+                    self.hits += 1
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any):
+        """store the value for the key in all tiers"""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._put_memory(key, value)
+
+        if self.sqlite_path is not None:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                    (key, pickle.dumps(value)),
+                )
+
+    def clear(self):
+        """drop all entries from all tiers and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+        if self.sqlite_path is not None:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, int]:
+        """return hit and miss counts and the number of entries in memory"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def configure_result_cache(
+    maxsize: int = 256, sqlite_path: Optional[str] = None
+) -> ResultCache:
+    """replace the process wide result cache, eg, to add a SQLite tier"""
+    global _result_cache
+    with _result_cache_lock:
+        _result_cache = ResultCache(maxsize, sqlite_path)
+        return _result_cache
+
+
+def get_result_cache() -> ResultCache:
+    """return the process wide result cache
+
+    Unless configured with `configure_result_cache`, it is set up from the environment
+    variables `ESTIMATOR_RESULT_CACHE_SIZE` (entries kept in memory, 0 to disable)
+    and `ESTIMATOR_RESULT_CACHE_DB` (path of the SQLite file, unset to disable).
+    """
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(
+                int(os.getenv("ESTIMATOR_RESULT_CACHE_SIZE", "256")),
+                os.getenv("ESTIMATOR_RESULT_CACHE_DB") or None,
+            )
+        return _result_cache
@@ -0,0 +1,88 @@
+# Standard
+from typing import Optional
+import copy
+
+# Third Party
+import fire
+
+# Local
+from .manifest import MANIFEST_VERSION, get_model_manifest_dir, save_model_manifest
+from .model import get_model_config
+
+
+def build_model_manifest(model_path: str, revision: Optional[str] = None) -> dict:
+    """build the manifest of a model, see get_model_manifest
+
+    The model is built with empty weights to read off its parameters, so this needs
+    the modeling code of the model, and the hub for models that are not local.
+
+    Args:
+        model_path (str): model path on filesystem or hugging face id
+        revision (Optional[str]): revision of the model on the hub
+
+    Returns:
+        dict: the manifest
+    """
+    # Third Party
+    from accelerate import init_empty_weights
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from transformers.pytorch_utils import Conv1D
+    import torch
+
+    config = get_model_config(model_path, revision)
+
+    # same order as the estimators, the tokenizer only when the config has no max length
+    if hasattr(config, "max_position_embeddings"):
+        model_max_length = config.max_position_embeddings
+    elif hasattr(config, "n_positions"):
+        model_max_length = config.n_positions
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(model_path, revision=revision)
+        model_max_length = tokenizer.model_max_length
+
+    with init_empty_weights():
+        model = AutoModelForCausalLM.from_config(copy.deepcopy(config))
+    # weights are not tied under init_empty_weights, which would count them twice
+    model.tie_weights()
+
+    # name, in_features and out_features of the modules LoRA can adapt, in model order
+    linear_modules = []
+    for name, module in model.named_modules():
+        if isinstance(module, torch.nn.Linear):
+            linear_modules.append([name, module.in_features, module.out_features])
+        elif isinstance(module, Conv1D):
+            linear_modules.append([name, *module.weight.shape])
+
+    return {
+        "version": MANIFEST_VERSION,
+        "model_path": model_path,
+        "revision": revision,
+        "config": config.to_dict(),
+        "model_max_length": model_max_length,
+        "num_params": model.num_parameters(),
+        "linear_modules": linear_modules,
+    }
+
+
+def gen(*models: str, output_dir: Optional[str] = None, revision: Optional[str] = None):
+    """
+    Inputs:
+    models: <str> paths on the filesystem or names on the HF hub of the models to write manifests of
+    output_dir: <str> the manifest dir to write to. Defaults to the dir the estimators read, set by ESTIMATOR_MODEL_MANIFESTS
+    revision: <str> for models on the HF hub, the revision to use
+    """
+    if output_dir is None:
+        output_dir = get_model_manifest_dir()
+    if output_dir is None:
+        raise ValueError("No output dir given and ESTIMATOR_MODEL_MANIFESTS is empty")
+
+    for model_path in models:
+        print("Generating manifest of", model_path, "...")
+        path = save_model_manifest(
+            build_model_manifest(model_path, revision), output_dir
+        )
+        print("...successfully wrote manifest to file: ", path)
+
+
+if __name__ == "__main__":
+    fire.Fire(gen)
@@ -0,0 +1,110 @@
+# Standard
+from typing import TYPE_CHECKING, Optional
+import json
+import os
+import tempfile
+
+if TYPE_CHECKING:
+    # Third Party
+    from transformers import PretrainedConfig
+
+# Local
+from .utils import logger
+
+# Bumped whenever the fields of a manifest change, older manifests are then ignored
+MANIFEST_VERSION = 1
+
+
+def get_model_manifest_dir() -> Optional[str]:
+    """return the directory of model manifests
+
+    Set the environment variable `ESTIMATOR_MODEL_MANIFESTS` to change the location,
+    or to an empty string to not use manifests.
+
+    Returns:
+        Optional[str]: the directory, or None if manifests are not used
+    """
+    manifest_dir = os.getenv(
+        "ESTIMATOR_MODEL_MANIFESTS",
+        os.path.join(
+            os.path.expanduser("~"), ".cache", "fm_training_estimator", "manifests"
+        ),
+    )
+    if manifest_dir == "":
+        return None
+    return manifest_dir
+
+
+def get_model_manifest_path(
+    manifest_dir: str, model_path: str, revision: Optional[str] = None
+) -> str:
+    # same naming scheme as the HF hub cache, so ids with a "/" map to a single dir
+    model_dir = "models--" + model_path.replace("/", "--")
+    return os.path.join(manifest_dir, model_dir, (revision or "main") + ".json")
+
+
+def get_model_manifest(
+    model_path: str, revision: Optional[str] = None
+) -> Optional[dict]:
+    """return the manifest of the model from the manifest dir, if there is one
+
+    A manifest holds the architecture facts of a model that the estimators need:
+    its config, max length, number of parameters and the shapes of its linear
+    modules. With manifests of all models in the manifest dir, estimates neither
+    reach the hub nor build models. See `gen_manifest` to create them.
+
+    Args:
+        model_path (str): model path on filesystem or hugging face id
+        revision (Optional[str]): revision of the model on the hub
+
+    Returns:
+        Optional[dict]: the manifest, or None if there is no usable manifest
+    """
+    manifest_dir = get_model_manifest_dir()
+    if manifest_dir is None:
+        return None
+
+    path = get_model_manifest_path(manifest_dir, model_path, revision)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read model manifest %s: %s", path, e)
+        return None
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.warning("Ignoring model manifest %s of another version", path)
+        return None
+
+    return manifest
+
+
+def save_model_manifest(manifest: dict, manifest_dir: str) -> str:
+    """write the manifest into the manifest dir, replacing any earlier one
+
+    Returns:
+        str: path of the written manifest
+    """
+    path = get_model_manifest_path(
+        manifest_dir, manifest["model_path"], manifest["revision"]
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # write to a temp file first, so that concurrent readers never see a partial manifest
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def config_from_manifest(manifest: dict) -> "PretrainedConfig":
+    """return the model config stored in the manifest"""
+    # Third Party
+    from transformers import AutoConfig
+
+    config = dict(manifest["config"])
+    return AutoConfig.for_model(config.pop("model_type"), **config)
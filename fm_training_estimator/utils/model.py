@@ -1,8 +1,151 @@
 # Standard
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
 import logging
+import os
+import shutil
+import tempfile
+import threading
 
-# Third Party
-from transformers import AutoConfig
+if TYPE_CHECKING:
+    # Third Party
+    from transformers import PretrainedConfig
+
+# Local
+from .cache import fingerprint
+from .manifest import config_from_manifest, get_model_manifest
+from .profiling import span
+from .utils import logger
+
+# Number of model configs kept in memory per process
+MODEL_CONFIG_CACHE_SIZE = 64
+
+_model_configs = OrderedDict()
+_model_configs_lock = threading.Lock()
+
+
+def get_model_config_cache_dir() -> Optional[str]:
+    """return the directory where model configs from the hub are persisted
+
+    Set the environment variable `ESTIMATOR_MODEL_CONFIG_CACHE` to change the
+    location, or to an empty string to disable the on-disk store.
+
+    Returns:
+        Optional[str]: the directory, or None if the on-disk store is disabled
+    """
+    cache_dir = os.getenv(
+        "ESTIMATOR_MODEL_CONFIG_CACHE",
+        os.path.join(
+            os.path.expanduser("~"), ".cache", "fm_training_estimator", "model_configs"
+        ),
+    )
+    if cache_dir == "":
+        return None
+    return cache_dir
+
+
+def _is_pinned(revision: Optional[str]) -> bool:
+    # branches like main move, so only configs of a fixed revision can be kept forever
+    return revision is not None and revision != "main"
+
+
+def _get_model_config_store_path(cache_dir: str, model_path: str, revision: str) -> str:
+    # same naming scheme as the HF hub cache, so ids with a "/" map to a single dir
+    model_dir = "models--" + model_path.replace("/", "--")
+    return os.path.join(cache_dir, model_dir, revision)
+
+
+def _load_model_config(model_path: str, revision: Optional[str]) -> "PretrainedConfig":
+    # Third Party
+    from transformers import AutoConfig
+
+    # local models are read as they are, not from manifests or the on-disk store
+    if os.path.isdir(model_path):
+        return AutoConfig.from_pretrained(model_path, revision=revision)
+
+    manifest = get_model_manifest(model_path, revision)
+    if manifest is not None:
+        return config_from_manifest(manifest)
+
+    cache_dir = get_model_config_cache_dir()
+    if cache_dir is None or not _is_pinned(revision):
+        return AutoConfig.from_pretrained(model_path, revision=revision)
+
+    store_path = _get_model_config_store_path(cache_dir, model_path, revision)
+    if os.path.isdir(store_path):
+        return AutoConfig.from_pretrained(store_path)
+
+    config = AutoConfig.from_pretrained(model_path, revision=revision)
+
+    try:
+        # write to a temp dir first, so that concurrent readers never see a partial config
+        os.makedirs(os.path.dirname(store_path), exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=os.path.dirname(store_path))
+        config.save_pretrained(tmp_path)
+        try:
+            os.rename(tmp_path, store_path)
+        except OSError:
+            # another process stored this config first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    except OSError as e:
+        logger.warning("Could not store model config of %s: %s", model_path, e)
+
+    return config
+
+
+def _local_config_fingerprint(model_path: str):
+    # edits to the config of a local model must not be served from memory
+    config_path = os.path.join(model_path, "config.json")
+    if os.path.isfile(config_path):
+        return fingerprint(config_path)
+    return None
+
+
+def get_model_config(
+    model_path: str, revision: Optional[str] = None
+) -> "PretrainedConfig":
+    """return the config of the model, loading it at most once per process
+
+    Configs are kept in an in-memory LRU cache, those of local models until their
+    config.json changes. Configs of models from the hub
+    are read from their manifest where there is one, see `get_model_manifest`, and
+    are otherwise persisted on disk keyed by model id and revision, see
+    `get_model_config_cache_dir`, so later runs do not need to reach the hub. Only
+    configs of a pinned revision, not None or "main", are persisted, the others
+    are fetched again by every process.
+
+    The returned config is shared across callers and must not be modified.
+
+    Args:
+        model_path (str): model path on filesystem or hugging face id
+        revision (Optional[str]): revision of the model on the hub
+
+    Returns:
+        PretrainedConfig: the model config
+    """
+    key = (model_path, revision, _local_config_fingerprint(model_path))
+    with _model_configs_lock:
+        if key in _model_configs:
+            _model_configs.move_to_end(key)
+            return _model_configs[key]
+
+    # loading is done outside the lock, a concurrent miss at worst loads twice
+    with span("model_config"):
+        config = _load_model_config(model_path, revision)
+
+    with _model_configs_lock:
+        _model_configs[key] = config
+        _model_configs.move_to_end(key)
+        while len(_model_configs) > MODEL_CONFIG_CACHE_SIZE:
+            _model_configs.popitem(last=False)
+
+    return config
+
+
+def clear_model_config_cache():
+    """drop all model configs from the in-memory cache. The on-disk store is kept."""
+    with _model_configs_lock:
+        _model_configs.clear()
 
 
 def get_model_max_length(model_path: str) -> int:
@@ -14,7 +157,7 @@ def get_model_max_length(model_path: str) -> int:
     Returns:
         int: max sequence length
     """
-    config = AutoConfig.from_pretrained(model_path)
+    config = get_model_config(model_path)
     n_positions = 4096
     if hasattr(config, "n_positions"):
         n_positions = config.n_positions
@@ -32,7 +175,7 @@ def extract_model_features(model, fmt="dict"):
     "csv": return a comma separated string of values
     """
     try:
-        conf = AutoConfig.from_pretrained(model)
+        conf = get_model_config(model)
         conf = conf.to_dict()
         res = {}
 
@@ -0,0 +1,123 @@
+# Standard
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import functools
+import threading
+import time
+
+
+class SpanHook:
+    """Receives the spans of the stages of an estimate, eg, to forward them to a tracer.
+
+    Subclass, override the methods needed and register with `add_span_hook`. Hooks see
+    every span, whether or not timings are being collected. They are called from the
+    thread running the stage, so they must be thread safe.
+    """
+
+    def on_span_start(self, name: str) -> Any:
+        """called when a span starts. The returned value is passed back to on_span_end."""
+        return None
+
+    def on_span_end(self, name: str, duration: float, token: Any):
+        """called when a span ends, with its wall time in seconds"""
+
+
+class Timings:
+    """Wall time and number of calls of every stage, collected by `collect_timings`."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration: float):
+        with self._lock:
+            stage = self._stages.setdefault(name, {"time": 0.0, "calls": 0})
+            stage["time"] += duration
+            stage["calls"] += 1
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """return the total time in seconds and the number of calls of every stage, in order of first call"""
+        with self._lock:
+            return {name: dict(stage) for name, stage in self._stages.items()}
+
+
+_timings: ContextVar[Optional[Timings]] = ContextVar(
+    "fm_training_estimator_timings", default=None
+)
+# replaced, never modified in place, so spans can read it without a lock
+_hooks = ()
+_hooks_lock = threading.Lock()
+
+
+def add_span_hook(hook: SpanHook):
+    """register a hook to be called for all spans, in all threads"""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_span_hook(hook: SpanHook):
+    """unregister a hook added with `add_span_hook`"""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+@contextmanager
+def span(name: str):
+    """time the block as a stage with the given name
+
+    Nothing is measured unless timings are being collected or hooks are registered.
+    Nested spans are timed independently, so the time of a stage includes that of
+    the stages run inside it.
+    """
+    timings = _timings.get()
+    hooks = _hooks
+    if timings is None and len(hooks) == 0:
+        yield
+        return
+
+    tokens = [hook.on_span_start(name) for hook in hooks]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if timings is not None:
+            timings.add(name, duration)
+        for hook, token in zip(hooks, tokens):
+            hook.on_span_end(name, duration, token)
+
+
+@contextmanager
+def collect_timings(enabled: bool = True):
+    """collect the timings of all spans run in the block, in the current context
+
+    Yields:
+        Optional[Timings]: the collected timings, or None if not enabled
+    """
+    if not enabled:
+        yield None
+        return
+
+    timings = Timings()
+    reset = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(reset)
+
+
+def timed(name: str):
+    """decorator, running every call of the function in a span with the given name"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,95 @@
+# Standard
+import sqlite3
+
+# Third Party
+import pytest
+
+# Local
+from ..config import FMArguments, HFTrainingArguments
+from .cache import ResultCache, input_fingerprints, make_cache_key
+
+
+def test_make_cache_key(tmp_path):
+    # the HF logging_dir carries a timestamp, it must not change the key
+    ta1 = HFTrainingArguments(logging_dir="/tmp/a")
+    ta2 = HFTrainingArguments(logging_dir="/tmp/b")
+    fm = FMArguments()
+    assert make_cache_key(fm, ta1) == make_cache_key(fm, ta2)
+
+    ta3 = HFTrainingArguments(per_device_train_batch_size=16)
+    assert make_cache_key(fm, ta1) != make_cache_key(fm, ta3)
+
+    # rewriting an input file changes the key
+    data = tmp_path / "data.csv"
+    data.write_text("a,b\n1,2\n")
+    key = make_cache_key(fm, input_fingerprints(data.as_posix()))
+    data.write_text("a,b\n1,2\n3,4\n")
+    assert key != make_cache_key(fm, input_fingerprints(data.as_posix()))
+
+
+def test_make_cache_key_settings(monkeypatch):
+    monkeypatch.delenv("ESTIMATOR_LOOKUP_MAX_DISTANCE", raising=False)
+    monkeypatch.delenv("ESTIMATOR_MODEL_MANIFESTS", raising=False)
+    fm = FMArguments()
+    key = make_cache_key(fm)
+
+    # settings that change estimates change the key
+    monkeypatch.setenv("ESTIMATOR_LOOKUP_MAX_DISTANCE", "0")
+    assert make_cache_key(fm) != key
+    monkeypatch.delenv("ESTIMATOR_LOOKUP_MAX_DISTANCE")
+    assert make_cache_key(fm) == key
+
+    monkeypatch.setenv("ESTIMATOR_MODEL_MANIFESTS", "/tmp/manifests")
+    assert make_cache_key(fm) != key
+
+
+def test_result_cache():
+    cache = ResultCache(maxsize=2)
+
+    assert cache.get("a") is None
+    cache.put("a", {"tps": 1})
+    cache.put("b", {"tps": 2})
+    assert cache.get("a") == {"tps": 1}
+
+    # "b" is the least recently used entry
+    cache.put("c", {"tps": 3})
+    assert cache.get("b") is None
+
+    # returned values are copies
+    cache.get("a")["tps"] = 10
+    assert cache.get("a") == {"tps": 1}
+
+    assert cache.stats() == {"hits": 3, "misses": 2, "size": 2}
+
+
+def test_result_cache_sqlite(tmp_path):
+    db = (tmp_path / "cache.db").as_posix()
+
+    cache = ResultCache(maxsize=0, sqlite_path=db)
+    cache.put("a", {"tps": 1})
+
+    # a new cache on the same file, eg, in a later run
+    cache = ResultCache(sqlite_path=db)
+    assert cache.get("a") == {"tps": 1}
+    assert cache.stats()["hits"] == 1
+
+
+def test_result_cache_sqlite_closes_connections(tmp_path, monkeypatch):
+    conns = []
+    connect = sqlite3.connect
+
+    def tracked(*args, **kwargs):
+        conns.append(connect(*args, **kwargs))
+        return conns[-1]
+
+    monkeypatch.setattr(sqlite3, "connect", tracked)
+
+    cache = ResultCache(maxsize=0, sqlite_path=(tmp_path / "cache.db").as_posix())
+    cache.put("a", {"tps": 1})
+    assert cache.get("a") == {"tps": 1}
+    cache.clear()
+
+    assert len(conns) == 4
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
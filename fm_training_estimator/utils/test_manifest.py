@@ -0,0 +1,71 @@
+# Third Party
+from transformers import GPT2Config, LlamaConfig
+
+# Local
+from ..config import parse
+from ..memory.lora import LoraEstimator
+from .gen_manifest import build_model_manifest, gen
+from .manifest import get_model_manifest, save_model_manifest
+from .model import clear_model_config_cache, extract_model_features, get_model_config
+
+
+def test_manifest_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("ESTIMATOR_MODEL_MANIFESTS", (tmp_path / "store").as_posix())
+    clear_model_config_cache()
+
+    LlamaConfig(
+        hidden_size=256,
+        intermediate_size=688,
+        num_hidden_layers=3,
+        num_attention_heads=8,
+        vocab_size=1000,
+        architectures=["LlamaForCausalLM"],
+    ).save_pretrained(tmp_path / "model")
+    gen((tmp_path / "model").as_posix())
+
+    manifest = get_model_manifest((tmp_path / "model").as_posix())
+    assert manifest["model_max_length"] == 2048
+    assert manifest["linear_modules"][0] == [
+        "model.layers.0.self_attn.q_proj",
+        256,
+        256,
+    ]
+    assert manifest["linear_modules"][-1] == ["lm_head", 256, 1000]
+
+    # a model from the hub with a manifest is served from it, without the hub
+    manifest["model_path"] = "no-such-org/no-such-model"
+    save_model_manifest(manifest, (tmp_path / "store").as_posix())
+
+    conf = get_model_config("no-such-org/no-such-model")
+    assert conf.num_hidden_layers == 3
+    assert isinstance(conf, LlamaConfig)
+    assert conf.max_position_embeddings == 2048
+
+    res = extract_model_features("no-such-org/no-such-model", fmt="list")
+    assert res == ["LlamaForCausalLM", 256, 688, 8, 3, 8]
+
+    assert get_model_manifest("no-such-org/no-such-model", revision="v1") is None
+    clear_model_config_cache()
+
+
+def test_manifest_lora_parameters(tmp_path, monkeypatch):
+    GPT2Config(n_embd=64, n_layer=2, n_head=4, vocab_size=1000).save_pretrained(
+        tmp_path / "model"
+    )
+    model_path = (tmp_path / "model").as_posix()
+    fm, ta, _, _, la, _ = parse(
+        {"base_model_path": model_path, "target_modules": ["c_attn", "c_fc"]}
+    )
+
+    # without a manifest, the counts are read off a peft model
+    monkeypatch.setenv("ESTIMATOR_MODEL_MANIFESTS", "")
+    expected = LoraEstimator(fm, ta, la)
+
+    monkeypatch.setenv("ESTIMATOR_MODEL_MANIFESTS", (tmp_path / "store").as_posix())
+    save_model_manifest(build_model_manifest(model_path), tmp_path / "store")
+    est = LoraEstimator(fm, ta, la)
+
+    assert est.num_of_model_params == expected.num_of_model_params
+    assert est.num_of_trainable_params == expected.num_of_trainable_params
+    assert est.lora_params.adapter_shapes.tolist() == [[64, 192], [64, 256]] * 2
+    assert est.calculate_activation_memory() == expected.calculate_activation_memory()
@@ -1,5 +1,9 @@
+# Third Party
+from pytest import raises
+from transformers import LlamaConfig
+
 # Local
-from .model import extract_model_features
+from .model import clear_model_config_cache, extract_model_features, get_model_config
 
 
 def test_extract_model_features():
@@ -18,3 +22,40 @@ def test_extract_model_features():
     # example from different format
     res = extract_model_features("ibm-granite/granite-20b-code-base", fmt="list")
     assert res == ["GPTBigCodeForCausalLM", 6144, 24576, 48, 52, 48]
+
+
+def test_get_model_config_local(tmp_path):
+    LlamaConfig(num_hidden_layers=4).save_pretrained(tmp_path)
+
+    conf = get_model_config(tmp_path.as_posix())
+    assert conf.num_hidden_layers == 4
+
+    # the second lookup is served from memory
+    assert get_model_config(tmp_path.as_posix()) is conf
+
+    # until the config is edited
+    LlamaConfig(num_hidden_layers=12).save_pretrained(tmp_path)
+    assert get_model_config(tmp_path.as_posix()).num_hidden_layers == 12
+
+
+def test_get_model_config_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("ESTIMATOR_MODEL_CONFIG_CACHE", tmp_path.as_posix())
+    clear_model_config_cache()
+
+    # a config of a pinned revision persisted by an earlier run is used without
+    # reaching the hub
+    store_path = tmp_path / "models--no-such-org--no-such-model" / "abc123"
+    LlamaConfig(
+        num_hidden_layers=6, architectures=["LlamaForCausalLM"]
+    ).save_pretrained(store_path)
+
+    conf = get_model_config("no-such-org/no-such-model", revision="abc123")
+    assert conf.num_hidden_layers == 6
+
+    # a moving revision is never read from the store
+    LlamaConfig(
+        num_hidden_layers=6, architectures=["LlamaForCausalLM"]
+    ).save_pretrained(tmp_path / "models--no-such-org--no-such-model" / "main")
+
+    with raises(OSError):
+        get_model_config("no-such-org/no-such-model")
@@ -0,0 +1,59 @@
+# Local
+from .profiling import (
+    SpanHook,
+    add_span_hook,
+    collect_timings,
+    remove_span_hook,
+    span,
+    timed,
+)
+
+
+@timed("outer")
+def _outer():
+    for _ in range(3):
+        with span("inner"):
+            pass
+
+
+def test_collect_timings():
+    with collect_timings() as timings:
+        _outer()
+        _outer()
+
+    res = timings.as_dict()
+    assert list(res.keys()) == ["inner", "outer"]
+    assert res["inner"]["calls"] == 6
+    assert res["outer"]["calls"] == 2
+    # nested spans are included in the time of the outer one
+    assert res["outer"]["time"] >= res["inner"]["time"]
+
+    # nothing is collected outside the block, or when not enabled
+    _outer()
+    assert timings.as_dict() == res
+    with collect_timings(False) as timings:
+        _outer()
+    assert timings is None
+
+
+def test_span_hook():
+    class Recorder(SpanHook):
+        def __init__(self):
+            self.spans = []
+
+        def on_span_start(self, name):
+            return name.upper()
+
+        def on_span_end(self, name, duration, token):
+            self.spans.append((name, token))
+
+    hook = Recorder()
+    add_span_hook(hook)
+    try:
+        # hooks get the spans without collecting timings
+        _outer()
+    finally:
+        remove_span_hook(hook)
+    _outer()
+
+    assert hook.spans == [("inner", "INNER")] * 3 + [("outer", "OUTER")]
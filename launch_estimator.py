@@ -29,8 +29,8 @@ import sys
 import traceback
 
 # First Party
-from fm_training_estimator.config.arguments import EstimateInput, MemoryEstimate
-from fm_training_estimator.sdk import estimate_memory, estimate_time, estimate_tokens
+from fm_training_estimator.config.arguments import EstimateInput
+from fm_training_estimator.sdk import estimate
 
 logging.basicConfig(level=logging.INFO)
 
@@ -74,55 +74,36 @@ def main():
 
     out_content = "Input parsed for this estimate: " + str(estimator_input) + "\n\n"
 
-    ############ Memory ############
-    out_content += "Estimating Memory:....\n"
-
-    memory_output = estimate_memory(estimator_input)
-    f = open(os.path.join(out_path, "memory_theory.json"), "w")
-    f.write(json.dumps(memory_output.__dict__))
-    f.close()
-
-    out_content += "With only theory: " + str(memory_output) + "\n"
-    if model_path:
-        memory_output = estimate_memory(estimator_input, model_path)
-        out_content += "With reg model: " + str(memory_output) + "\n"
-        f = open(os.path.join(out_path, "memory_hybrid.json"), "w")
-        f.write(json.dumps(memory_output.__dict__))
-        f.close()
-
-    ############ Time ############
-    out_content += "\n" * 3
-    out_content += "Estimating Time:....\n"
-
-    time_output = estimate_time(estimator_input)
-    f = open(os.path.join(out_path, "time_theory.json"), "w")
-    f.write(json.dumps(time_output.__dict__))
-    f.close()
-
-    out_content += "With only theory: " + str(time_output) + "\n"
+    # theory and hybrid estimates share the token estimates and lookup data
     if model_path:
-        time_output = estimate_time(estimator_input, model_path)
-        out_content += "With reg model: " + str(time_output) + "\n"
-        f = open(os.path.join(out_path, "time_hybrid.json"), "w")
-        f.write(json.dumps(time_output.__dict__))
+        theory_output, hybrid_output = estimate(
+            estimator_input, model_path, include_theory=True
+        )
+    else:
+        theory_output, hybrid_output = estimate(estimator_input), None
+
+    sections = [
+        ("Memory", "memory", "memory"),
+        ("Time", "time", "time"),
+        ("tps", "tps", "tokens"),
+    ]
+    for i, (title, file_prefix, field) in enumerate(sections):
+        if i > 0:
+            out_content += "\n" * 3
+        out_content += "Estimating " + title + ":....\n"
+
+        output = getattr(theory_output, field)
+        f = open(os.path.join(out_path, file_prefix + "_theory.json"), "w")
+        f.write(json.dumps(output.__dict__))
         f.close()
 
-    ############ Tps ############
-    out_content += "\n" * 3
-    out_content += "Estimating tps:....\n"
-
-    tps_output = estimate_tokens(estimator_input)
-    f = open(os.path.join(out_path, "tps_theory.json"), "w")
-    f.write(json.dumps(tps_output.__dict__))
-    f.close()
-
-    out_content += "With only theory: " + str(tps_output) + "\n"
-    if model_path:
-        tps_output = estimate_tokens(estimator_input, model_path)
-        out_content += "With reg model: " + str(tps_output) + "\n"
-        f = open(os.path.join(out_path, "tps_hybrid.json"), "w")
-        f.write(json.dumps(tps_output.__dict__))
-        f.close()
+        out_content += "With only theory: " + str(output) + "\n"
+        if hybrid_output is not None:
+            output = getattr(hybrid_output, field)
+            out_content += "With reg model: " + str(output) + "\n"
+            f = open(os.path.join(out_path, file_prefix + "_hybrid.json"), "w")
+            f.write(json.dumps(output.__dict__))
+            f.close()
 
     print(out_content)
 